@@ -0,0 +1,60 @@
+# app/agents/agent_pool.py
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+from crewai import Agent
+
+class AgentPool:
+    """
+    Thread-safe pool of reusable CrewAI agents.
+
+    Agents are built lazily by the factory, up to ``max_size``, and handed out
+    one caller at a time so concurrent sessions never share a running agent.
+    Only the Task varies per request; the Agent and its LLM handle are reused.
+    """
+    
+    def __init__(self, factory: Callable[[], Agent], max_size: int = 4):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._factory = factory
+        self._max_size = max_size
+        self._idle: "queue.LifoQueue[Agent]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def size(self) -> int:
+        """Number of agents created so far"""
+        return self._created
+    
+    def _checkout(self) -> Agent:
+        """Take an idle agent, build a new one if under capacity, or wait"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            can_create = self._created < self._max_size
+            if can_create:
+                self._created += 1
+        
+        if can_create:
+            try:
+                return self._factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        
+        return self._idle.get()
+    
+    @contextmanager
+    def acquire(self) -> Iterator[Agent]:
+        """Borrow an agent for the duration of a single crew run"""
+        agent = self._checkout()
+        try:
+            yield agent
+        finally:
+            self._idle.put(agent)
@@ -1,11 +1,20 @@
 # app/agents/exam_agent.py
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from crewai import Agent, Task, Crew
-from llm.llm_client import get_crewai_llm
+from agents.agent_pool import AgentPool
+from llm.llm_client import ModelCascade, get_crewai_llm_for_task
 from tools.pdf_chunk_loader import create_pdf_chunking_service, ChunkingConfig
+from tools.exam_question_parser import ExamQuestion, ExamQuestionParser
 from services.text_processor import TextProcessorService, get_text_processor
+from services.topic_index_service import (
+    EXAM_INDEX, DocumentTopicIndex, TopicIndexService, create_topic_index_service, parse_topic_labels
+)
 
 @dataclass
 class ExamAnalysisRequest:
@@ -21,6 +30,7 @@ class ExamAnalysisResult:
     study_recommendations: Dict[str, str]
     coverage_analysis: str
     preparation_suggestions: str
+    topic_weights: Dict[str, float] = field(default_factory=dict)
 
 class ExamAnalyzer(ABC):
     """Abstract base class for exam analysis strategies"""
@@ -29,76 +39,118 @@ class ExamAnalyzer(ABC):
     def analyze_exam_content(self, content: str) -> List[str]:
         pass
     
-    @abstractmethod
-    def analyze_study_coverage(self, exam_topics: List[str], study_content: str) -> Dict[str, str]:
-        pass
+    def analyze_exam_questions(self, questions: List[ExamQuestion]) -> Dict[str, float]:
+        """Return exam topics mapped to their share of the paper (defaults to equal weights)"""
+        topics = self.analyze_exam_content("\n\n".join(q.text for q in questions))
+        return {topic: 1.0 / len(topics) for topic in topics} if topics else {}
 
 class LLMExamAnalyzer(ExamAnalyzer):
     """Concrete implementation using LLM for exam analysis"""
     
-    def __init__(self, text_processor: TextProcessorService):
+    def __init__(self, 
+                 text_processor: TextProcessorService, 
+                 question_parser: Optional[ExamQuestionParser] = None,
+                 max_workers: int = 4):
         self.text_processor = text_processor
-        self.llm = get_crewai_llm()  # Use CrewAI-compatible LLM
+        self.question_parser = question_parser or ExamQuestionParser()
+        self.max_workers = max_workers
+        self.topic_cascade = ModelCascade("question_topics")
     
-    def analyze_exam_content(self, content: str) -> List[str]:
-        """Extract topics and themes from exam content"""
+    @staticmethod
+    def _read_topics_json(result: str) -> Optional[List[str]]:
+        """Read the topics array from a JSON reply, tolerating surrounding prose"""
+        match = re.search(r"\{.*\}", result, re.DOTALL)
+        if not match:
+            return None
+        try:
+            topics = json.loads(match.group(0)).get("topics", [])
+            return [str(topic).strip() for topic in topics if str(topic).strip()]
+        except (ValueError, AttributeError):
+            return None
+    
+    @classmethod
+    def _parse_topics_json(cls, result: str) -> List[str]:
+        topics = cls._read_topics_json(result)
+        return topics if topics is not None else parse_topic_labels(result)
+    
+    def extract_question_topics(self, question: ExamQuestion) -> List[str]:
+        """Extract the topics tested by a single exam question"""
         from langchain.prompts import ChatPromptTemplate
         
         prompt = ChatPromptTemplate.from_template("""
-        You are an academic exam analyzer. Analyze the following exam content and extract:
-        - Main topics and subjects covered
-        - Key concepts that students need to know
-        - Skills and knowledge areas being tested
+        You are an academic exam analyzer. Identify the 1 to 3 main topics or
+        concepts a student must know to answer this exam question.
         
-        Return a comma-separated list of topics.
+        Respond with JSON only, in the form: {{"topics": ["topic one", "topic two"]}}
+        Use short, general topic names (2-5 words) rather than restating the question.
         
-        EXAM CONTENT:
-        {content}
+        QUESTION:
+        {question}
         """)
         
-        result = self.llm.invoke(prompt.format(content=content))
-        # Parse the comma-separated result into a list
-        return [topic.strip() for topic in result.split(',') if topic.strip()]
+        # Small model first; escalate when it does not return valid JSON topics
+        result = self.topic_cascade.invoke(
+            prompt.format(question=question.text), 
+            accept=lambda reply: bool(self._read_topics_json(reply))
+        )
+        return self._parse_topics_json(result)
     
-    def analyze_study_coverage(self, exam_topics: List[str], study_content: str) -> Dict[str, str]:
-        """Analyze how well study materials cover exam topics"""
-        from langchain.prompts import ChatPromptTemplate
-        
-        topics_str = ", ".join(exam_topics)
-        prompt = ChatPromptTemplate.from_template("""
-        You are an academic study advisor. Given the following exam topics and study material content:
-        
-        EXAM TOPICS: {topics}
-        STUDY CONTENT: {content}
-        
-        For each exam topic, analyze:
-        1. How well the study material covers it (Well Covered/Partially Covered/Not Covered)
-        2. What specific areas need more attention
-        3. Recommendations for improvement
+    def _question_topics_or_empty(self, question: ExamQuestion) -> List[str]:
+        """A failed question is left out of the weighting instead of failing the whole exam"""
+        try:
+            return self.extract_question_topics(question)
+        except Exception as e:
+            print(f"Error extracting topics for question {question.number}: {e}")
+            return []
+    
+    def analyze_exam_questions(self, questions: List[ExamQuestion]) -> Dict[str, float]:
+        """Extract topics per question concurrently and weight them by marks"""
+        questions = [q for q in questions if q.text.strip()]
+        if not questions:
+            return {}
         
-        Format your response as: Topic: Coverage_Status - Recommendations
-        """)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            per_question = list(executor.map(self._question_topics_or_empty, questions))
         
-        result = self.llm.invoke(prompt.format(topics=topics_str, content=study_content))
+        # Questions without detected marks count as an average question
+        known_marks = [q.marks for q in questions if q.marks]
+        default_marks = sum(known_marks) / len(known_marks) if known_marks else 1.0
         
-        # Parse the result into a dictionary
-        coverage_dict = {}
-        for line in result.split('\n'):
-            if ':' in line and '-' in line:
-                topic_part, recommendation = line.split('-', 1)
-                topic = topic_part.split(':')[0].strip()
-                coverage_dict[topic] = recommendation.strip()
+        weights: Dict[str, float] = {}
+        display: Dict[str, str] = {}
+        for question, topics in zip(questions, per_question):
+            if not topics:
+                continue
+            share = (question.marks or default_marks) / len(topics)
+            for topic in topics:
+                key = topic.casefold()
+                display.setdefault(key, topic)
+                weights[key] = weights.get(key, 0.0) + share
         
-        return coverage_dict
+        total = sum(weights.values()) or 1.0
+        ranked = sorted(weights.items(), key=lambda item: item[1], reverse=True)
+        return {display[key]: weight / total for key, weight in ranked}
+    
+    def analyze_exam_content(self, content: str) -> List[str]:
+        """Extract topics and themes from exam content, ordered by weight"""
+        return list(self.analyze_exam_questions(self.question_parser.parse_text(content)))
 
 class ExamAgent:
     """Main exam agent that orchestrates the analysis process"""
     
-    def __init__(self, analyzer: ExamAnalyzer, chunking_service=None):
+    def __init__(self, 
+                 analyzer: ExamAnalyzer, 
+                 chunking_service=None, 
+                 agent_pool: Optional[AgentPool] = None,
+                 topic_index_service: Optional[TopicIndexService] = None,
+                 text_processor: Optional[TextProcessorService] = None):
         self.analyzer = analyzer
         self.chunking_service = chunking_service or create_pdf_chunking_service()
-        self.llm = get_crewai_llm()  # Use CrewAI-compatible LLM
-        self.agent = self._create_agent()
+        self.topic_index_service = topic_index_service or create_topic_index_service()
+        self.text_processor = text_processor or get_text_processor()
+        self.question_parser = ExamQuestionParser()
+        self.llm = get_crewai_llm_for_task("exam_recommendations")  # Use CrewAI-compatible LLM
+        self.agent_pool = agent_pool or AgentPool(self._create_agent)
     
     def _create_agent(self) -> Agent:
         """Create the CrewAI agent for exam analysis"""
@@ -114,24 +166,42 @@ class ExamAgent:
             llm=self.llm
         )
     
-    def _extract_content_from_files(self, file_paths: List[str]) -> str:
-        """Extract and combine content from multiple files"""
-        all_content = []
+    def _extract_exam_topics(self, file_path: str, chunks: List[str]) -> Dict[str, float]:
+        """Split the exam into questions (using the PDF layout when available) and weight topics"""
+        questions = self.question_parser.parse_pdf(file_path) if file_path.lower().endswith(".pdf") else []
+        if not questions:
+            # Scanned papers have no text layer; fall back to the (OCR'd) chunk text
+            questions = self.question_parser.parse_text("\n".join(chunks))
+        return self.analyzer.analyze_exam_questions(questions)
+    
+    def _extract_study_topics(self, file_path: str, chunks: List[str]) -> Dict[str, float]:
+        return {label: 1.0 for label in parse_topic_labels(self.text_processor.extract_topics(chunks))}
+    
+    def _load_study_indexes(self, file_paths: List[str]) -> List[DocumentTopicIndex]:
+        """Load (or build once) the topic index of each study material"""
+        indexes = []
         for file_path in file_paths:
             try:
-                chunks = self.chunking_service.extract_and_chunk(file_path)
-                all_content.extend(chunks)
+                indexes.append(self.topic_index_service.get_or_build_for_file(
+                    file_path, self.chunking_service.extract_and_chunk, self._extract_study_topics
+                ))
             except Exception as e:
                 print(f"Error processing {file_path}: {e}")
-        return "\n\n".join(all_content)
+        return indexes
+    
+    @staticmethod
+    def _format_topic_weights(result: ExamAnalysisResult) -> str:
+        if not result.topic_weights:
+            return ", ".join(result.extracted_topics)
+        return ", ".join(f"{topic} ({weight:.0%})" for topic, weight in result.topic_weights.items())
     
-    def _create_analysis_task(self, request: ExamAnalysisRequest, analysis_result: ExamAnalysisResult) -> Task:
+    def _create_analysis_task(self, request: ExamAnalysisRequest, analysis_result: ExamAnalysisResult, agent: Agent) -> Task:
         """Create a comprehensive analysis task"""
         return Task(
             description=f"""
             Provide comprehensive exam preparation advice based on the analysis:
             
-            EXAM TOPICS IDENTIFIED: {', '.join(analysis_result.extracted_topics)}
+            EXAM TOPICS IDENTIFIED (share of marks): {self._format_topic_weights(analysis_result)}
             COVERAGE ANALYSIS: {analysis_result.coverage_analysis}
             
             Provide:
@@ -141,39 +211,41 @@ class ExamAgent:
             4. Additional resources if needed
             """,
             expected_output="Comprehensive exam preparation strategy with actionable recommendations",
-            agent=self.agent
+            agent=agent
         )
     
     def analyze_exam_and_materials(self, request: ExamAnalysisRequest) -> ExamAnalysisResult:
-        # Extract content from exam file
-        exam_content = self._extract_content_from_files([request.exam_file_path])
-        
-        # Extract content from study materials
-        study_content = self._extract_content_from_files(request.study_material_paths)
-        
-        # Analyze exam content
-        exam_topics = self.analyzer.analyze_exam_content(exam_content)
+        # Topic indexes are keyed by content hash, so previously seen files skip extraction;
+        # exam indexes are kept apart from study indexes of the same file
+        exam_index = self.topic_index_service.get_or_build_for_file(
+            request.exam_file_path, self.chunking_service.extract_and_chunk, self._extract_exam_topics,
+            kind=EXAM_INDEX
+        )
+        study_indexes = self._load_study_indexes(request.study_material_paths)
         
-        # Analyze study coverage
-        coverage_analysis = self.analyzer.analyze_study_coverage(exam_topics, study_content)
+        # Match exam topics to study coverage by vector similarity
+        coverage = self.topic_index_service.match_coverage(exam_index, study_indexes)
+        coverage_analysis = {item.topic: item.describe() for item in coverage}
         
         # Create result object
         result = ExamAnalysisResult(
-            extracted_topics=exam_topics,
+            extracted_topics=exam_index.labels,
             study_recommendations=coverage_analysis,
-            coverage_analysis=str(coverage_analysis),
-            preparation_suggestions=""
+            coverage_analysis="\n".join(f"{topic}: {status}" for topic, status in coverage_analysis.items()),
+            preparation_suggestions="",
+            topic_weights=exam_index.weights
         )
         
-        # Create and execute comprehensive analysis task
-        task = self._create_analysis_task(request, result)
-        crew = Crew(
-            agents=[self.agent],
-            tasks=[task],
-            verbose=True
-        )
-        
-        comprehensive_analysis = crew.kickoff()
+        # Create and execute comprehensive analysis task on a pooled agent
+        with self.agent_pool.acquire() as agent:
+            task = self._create_analysis_task(request, result, agent)
+            crew = Crew(
+                agents=[agent],
+                tasks=[task],
+                verbose=True
+            )
+            
+            comprehensive_analysis = crew.kickoff()
         result.preparation_suggestions = str(comprehensive_analysis)
         
         return result
@@ -200,6 +272,7 @@ class ExamAgentService:
         return self.exam_agent.analyze_exam_and_materials(request)
 
 # Factory function
+@lru_cache(maxsize=1)
 def create_exam_agent_service() -> ExamAgentService:
-    """Create an exam agent service with default configuration"""
+    """Create (once per process) an exam agent service with default configuration"""
     return ExamAgentService()
\ No newline at end of file
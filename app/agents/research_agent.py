@@ -1,16 +1,31 @@
 # app/agents/research_agent.py
-from typing import Optional
+import os
+import threading
+from typing import Dict, List, Optional
 from dataclasses import dataclass
+from functools import lru_cache
 from crewai import Agent, Task, Crew
-from services.vector_store_service import VectorStoreService, create_vector_store_service
-from llm.llm_client import get_crewai_llm
+from langchain.schema.document import Document
+from agents.agent_pool import AgentPool
+from services.vector_store_service import AdaptiveRetrievalConfig, VectorStoreService, create_vector_store_service
+from services.conversation_memory import ConversationMemoryService, create_conversation_memory_service
+from services.retrieval_prefetcher import RetrievalPrefetcher
+from services.answer_pack_service import AnswerPackService
+from services.work_scheduler import QUESTION_TOKEN_ESTIMATE, QuotaExceededError, WorkType, get_work_scheduler
+from llm.llm_client import LLMFactory, get_crewai_llm_for_task, warm_up_model
+
+NO_CONTEXT_MESSAGE = "No relevant information found in the knowledge base."
 
 @dataclass
 class ResearchQuery:
-    """Data class for research queries"""
+    """Data class for research queries (``top_k`` is the upper bound when adaptive retrieval is on)"""
     question: str
     chat_id: str
     top_k: int = 4
+    retrieval_query: Optional[str] = None
+    conversation_context: str = ""
+    document_id: Optional[str] = None
+    prefetched_documents: Optional[List[Document]] = None
 
 class ResearchAgent:
     """
@@ -18,10 +33,14 @@ class ResearchAgent:
     Follows Single Responsibility Principle.
     """
     
-    def __init__(self, vector_store_service: VectorStoreService):
+    def __init__(self, 
+                 vector_store_service: VectorStoreService, 
+                 agent_pool: Optional[AgentPool] = None,
+                 adaptive_retrieval: Optional[AdaptiveRetrievalConfig] = None):
         self.vector_store_service = vector_store_service
-        self.llm = get_crewai_llm()  # Use CrewAI-compatible LLM
-        self.agent = self._create_agent()
+        self.llm = get_crewai_llm_for_task("research_answer")  # Use CrewAI-compatible LLM
+        self.agent_pool = agent_pool or AgentPool(self._create_agent)
+        self.adaptive_retrieval = adaptive_retrieval
     
     def _create_agent(self) -> Agent:
         """Create the CrewAI agent with proper configuration"""
@@ -39,23 +58,35 @@ class ResearchAgent:
         )
     
     def _get_relevant_context(self, query: ResearchQuery) -> str:
-        """Retrieve relevant documents and create context"""
-        docs = self.vector_store_service.get_query_chunks(
-            chat_id=query.chat_id,
-            query=query.question,
-            top_k=query.top_k
-        )
+        """Retrieve relevant documents (reusing prefetched results when possible) and create context"""
+        retrieval_query = query.retrieval_query or query.question
+        docs = query.prefetched_documents
+        if docs is None:
+            docs = self.vector_store_service.get_query_chunks(
+                chat_id=query.chat_id,
+                query=retrieval_query,
+                top_k=query.top_k,
+                adaptive=self.adaptive_retrieval,
+                document_id=query.document_id
+            )
         
         if not docs:
-            return "No relevant information found in the knowledge base."
+            return NO_CONTEXT_MESSAGE
         
         return "\n\n".join([doc.page_content for doc in docs])
     
-    def _create_research_task(self, query: ResearchQuery, context: str) -> Task:
+    def _create_research_task(self, query: ResearchQuery, context: str, agent: Agent) -> Task:
+        conversation = ""
+        if query.conversation_context:
+            conversation = f"""
+            Conversation so far (use it to resolve references in the question):
+            
+            {query.conversation_context}
+            """
         return Task(
             description=f"""
             Answer this user question about the research paper: '{query.question}'
-            
+            {conversation}
             Use the following context from the research papers:
             
             {context}
@@ -65,44 +96,156 @@ class ResearchAgent:
             clearly state what information is missing.
             """,
             expected_output="A precise and insightful answer using the document's content.",
-            agent=self.agent
+            agent=agent
         )
     
     def answer_question(self, query: ResearchQuery) -> str:
         # Get relevant context
         context = self._get_relevant_context(query)
         
-        if context == "No relevant information found in the knowledge base.":
+        # Early exit: nothing scored as relevant, so skip the LLM entirely
+        if context == NO_CONTEXT_MESSAGE:
             return context
         
-        # Create and execute task
-        task = self._create_research_task(query, context)
-        crew = Crew(
-            agents=[self.agent],
-            tasks=[task],
-            verbose=True
-        )
-        
-        result = crew.kickoff()
+        # Create and execute task on a pooled agent
+        with self.agent_pool.acquire() as agent:
+            task = self._create_research_task(query, context, agent)
+            crew = Crew(
+                agents=[agent],
+                tasks=[task],
+                verbose=True
+            )
+            
+            result = crew.kickoff()
         return str(result)
 
 class ResearchAgentService:
     """Service class for managing research agent operations"""
     
-    def __init__(self, vector_store_service: Optional[VectorStoreService] = None):
+    def __init__(self,
+                 vector_store_service: Optional[VectorStoreService] = None,
+                 memory_service: Optional[ConversationMemoryService] = None,
+                 enable_prefetch: Optional[bool] = None,
+                 adaptive_retrieval: Optional[AdaptiveRetrievalConfig] = None,
+                 answer_pack_service: Optional[AnswerPackService] = None):
         self.vector_store_service = vector_store_service or create_vector_store_service()
-        self.research_agent = ResearchAgent(self.vector_store_service)
+        self.memory_service = memory_service or create_conversation_memory_service()
+        if adaptive_retrieval is None and os.environ.get("EDUAGENT_ADAPTIVE_TOPK", "1") == "1":
+            adaptive_retrieval = AdaptiveRetrievalConfig()
+        if enable_prefetch is None:
+            enable_prefetch = os.environ.get("EDUAGENT_PREFETCH", "0") == "1"
+        self.prefetcher = (
+            RetrievalPrefetcher(self.vector_store_service, adaptive=adaptive_retrieval) 
+            if enable_prefetch else None
+        )
+        self.research_agent = ResearchAgent(
+            self.vector_store_service, 
+            adaptive_retrieval=adaptive_retrieval
+        )
+        if answer_pack_service is None and os.environ.get("EDUAGENT_ANSWER_PACKS", "0") == "1":
+            answer_pack_service = AnswerPackService()
+        self.answer_pack_service = answer_pack_service
     
-    def ask_question(self, question: str, chat_id: str, top_k: int = 4) -> str:
-        """Convenience method for asking questions"""
-        query = ResearchQuery(
-            question=question,
-            chat_id=chat_id,
-            top_k=top_k
+    @property
+    def answer_packs_enabled(self) -> bool:
+        return self.answer_pack_service is not None
+    
+    def schedule_answer_pack(self, chat_id: str, document_id: str) -> None:
+        """Pre-generate answers to canonical questions for a newly ingested document in the background"""
+        if not self.answer_pack_service:
+            return
+        # Older answers (and builds still running for them) no longer describe "this paper"
+        self.answer_pack_service.expect(chat_id, document_id)
+        answer_fn = lambda question: self.research_agent.answer_question(
+            ResearchQuery(question=question, chat_id=chat_id, document_id=document_id)
         )
-        return self.research_agent.answer_question(query)
+        tokens = len(self.answer_pack_service.config.questions) * QUESTION_TOKEN_ESTIMATE
+        try:
+            get_work_scheduler().submit(
+                chat_id, WorkType.BULK, self.answer_pack_service.build_pack, chat_id, document_id, answer_fn,
+                tokens=tokens
+            )
+        except QuotaExceededError as e:
+            print(f"📦 Skipping answer pack for {chat_id}: {e}")
+    
+    def _packed_answer(self, chat_id: str, question: str) -> Optional[str]:
+        if not self.answer_pack_service:
+            return None
+        return self.answer_pack_service.lookup(chat_id, question)
+    
+    @property
+    def prefetch_enabled(self) -> bool:
+        return self.prefetcher is not None
+    
+    def invalidate_retrieval(self, chat_id: str) -> None:
+        """Forget prefetched chunks for a chat whose documents changed"""
+        if self.prefetcher:
+            self.prefetcher.invalidate(chat_id)
+    
+    def prefetch(self, question: str, chat_id: str, top_k: int = 4) -> None:
+        """Speculatively warm retrieval and the LLM for a question still being typed"""
+        if not self.prefetcher:
+            return
+        # Follow-ups are looked up by their standalone rewrite, so retrieve with that too
+        rewrite = None
+        if not self.memory_service.get_memory(chat_id).is_empty:
+            rewrite = lambda typed: self.memory_service.rewrite_query(chat_id, typed)
+        self.prefetcher.prefetch(chat_id, question, top_k, rewrite=rewrite)
+        threading.Thread(target=self._warm_up_models, daemon=True).start()
+    
+    @staticmethod
+    def _warm_up_models() -> None:
+        """Keep both the query-rewrite and answer models resident"""
+        for task in ("query_rewrite", "research_answer"):
+            spec = LLMFactory.get_task_spec(task)
+            warm_up_model(model=spec.model, base_url=spec.base_url)
+    
+    def ask_question(self, question: str, chat_id: str, top_k: int = 4) -> str:
+        """Convenience method for asking questions with conversational memory"""
+        # A matching prefetch already holds the standalone rewrite and its chunks
+        prefetched = self.prefetcher.lookup(chat_id, question, top_k) if self.prefetcher else None
+        if prefetched is not None:
+            standalone = prefetched.retrieval_query
+        elif not self.memory_service.get_memory(chat_id).is_empty:
+            standalone = self.memory_service.rewrite_query(chat_id, question)
+        else:
+            standalone = question
+        
+        # Standalone first questions can be served from the answer pack without any LLM call
+        answer = self._packed_answer(chat_id, standalone)
+        if answer is None:
+            query = ResearchQuery(
+                question=question,
+                chat_id=chat_id,
+                top_k=top_k,
+                retrieval_query=standalone,
+                conversation_context=self.memory_service.get_context(chat_id),
+                prefetched_documents=prefetched.documents if prefetched else None
+            )
+            answer = self.research_agent.answer_question(query)
+        self.memory_service.add_turn(chat_id, question, answer)
+        # The new turn changes how the next question is rewritten
+        self.invalidate_retrieval(chat_id)
+        return answer
+    
+    def clear_history(self, chat_id: str) -> None:
+        """Forget the conversation memory for a chat"""
+        self.memory_service.clear(chat_id)
+    
+    def restore_history(self, chat_id: str, messages: List[Dict[str, str]]) -> None:
+        """Seed conversation memory from a persisted chat history"""
+        turns = []
+        pending_question = None
+        for message in messages:
+            if message["role"] == "user":
+                pending_question = message["message"]
+            elif pending_question is not None:
+                turns.append((pending_question, message["message"]))
+                pending_question = None
+        self.memory_service.seed(chat_id, turns)
 
 # Factory function
+@lru_cache(maxsize=1)
 def create_research_agent_service() -> ResearchAgentService:
-    """Create a research agent service with default configuration"""
+    """Create (once per process) a research agent service with default configuration"""
     return ResearchAgentService()
\ No newline at end of file
@@ -0,0 +1,354 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+# Make sure Python can find other app modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+QUESTIONS = [
+    "What is the main contribution of this paper?",
+    "Which dataset was used for evaluation?",
+    "Explain the methodology in simple terms.",
+    "How does the proposed model compare with the baseline?",
+    "What are the limitations mentioned by the authors?",
+]
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class LatencyRecorder:
+    """Thread-safe latency samples per component or operation"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+    
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(name, []).append(seconds)
+    
+    def timed(self, name: str, fn: Callable) -> Callable:
+        """Wrap a callable so each call is recorded under ``name``"""
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - started)
+        return wrapper
+    
+    def reset(self) -> Dict[str, List[float]]:
+        with self._lock:
+            samples, self._samples = self._samples, {}
+        return samples
+
+
+class StubOllama:
+    """
+    Minimal stand-in for the Ollama HTTP API (/api/generate, /api/chat).
+
+    It sleeps a fixed time-to-first-token plus a per-token delay and serves at
+    most ``parallel`` requests at once, like a single Ollama instance, so queueing
+    in front of the model shows up in the numbers.
+    """
+    
+    def __init__(self, port: int, parallel: int, first_token_ms: float, per_token_ms: float, tokens: int):
+        self.parallel = threading.Semaphore(parallel)
+        self.slots = parallel
+        self.first_token = first_token_ms / 1000
+        self.per_token = per_token_ms / 1000
+        self.tokens = tokens
+        self.recorder = LatencyRecorder()
+        self._busy_lock = threading.Lock()
+        self.busy_seconds = 0.0
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+    
+    def _reply_text(self, prompt: str) -> str:
+        if '"topics"' in prompt:
+            return json.dumps({"topics": ["machine learning", "evaluation"]})
+        words = ["model", "data", "results", "method", "training", "accuracy", "baseline"]
+        return " ".join(random.choice(words) for _ in range(self.tokens))
+    
+    def _handler(self):
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, *args):
+                pass
+            
+            def _send_json(self, body: dict, status: int = 200):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def do_GET(self):
+                self._send_json({"models": []})
+            
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                prompt = payload.get("prompt") or " ".join(
+                    str(m.get("content", "")) for m in payload.get("messages", [])
+                )
+                if not prompt:
+                    # Warm-up / keep-alive ping
+                    self._send_json({"model": payload.get("model", ""), "done": True, "response": ""})
+                    return
+                
+                queued_at = time.perf_counter()
+                with stub.parallel:
+                    started = time.perf_counter()
+                    stub.recorder.record("llm_queue_wait", started - queued_at)
+                    time.sleep(stub.first_token + stub.per_token * stub.tokens)
+                    text = stub._reply_text(prompt)
+                    elapsed = time.perf_counter() - started
+                with stub._busy_lock:
+                    stub.busy_seconds += elapsed
+                stub.recorder.record("llm_service", elapsed)
+                
+                final = {
+                    "model": payload.get("model", ""),
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "done": True,
+                    "prompt_eval_count": len(prompt) // 4,
+                    "eval_count": stub.tokens,
+                }
+                if self.path.endswith("/api/chat"):
+                    final["message"] = {"role": "assistant", "content": text}
+                else:
+                    final["response"] = text
+                
+                if payload.get("stream", True) is False:
+                    self._send_json(final)
+                    return
+                # Streamed NDJSON: one content line, then the final "done" line
+                first = {**final, "done": False}
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for line in (first, {**final, "response": "", "message": {"role": "assistant", "content": ""}}):
+                    data = (json.dumps(line) + "\n").encode()
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.write(b"0\r\n\r\n")
+        
+        return Handler
+    
+    def start(self) -> None:
+        threading.Thread(target=self.server.serve_forever, name="stub-ollama", daemon=True).start()
+    
+    def reset_busy(self) -> float:
+        with self._busy_lock:
+            busy, self.busy_seconds = self.busy_seconds, 0.0
+        return busy
+
+
+def make_synthetic_pdf(path: str, pages: int) -> None:
+    """Write a text PDF with academic-looking filler"""
+    import fitz
+    vocabulary = (
+        "we propose a novel transformer model trained on a large dataset and evaluate accuracy "
+        "against strong baselines using cross validation the method improves retrieval latency"
+    ).split()
+    rng = random.Random(3)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        text = "\n".join(" ".join(rng.choice(vocabulary) for _ in range(14)) for _ in range(45))
+        page.insert_text((50, 50), text, fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+@dataclass
+class LevelResult:
+    concurrency: int
+    wall_seconds: float
+    operations: Dict[str, List[float]]
+    components: Dict[str, List[float]]
+    llm_utilization: float
+    cpu_utilization: float
+    errors: List[str] = field(default_factory=list)
+
+
+class LoadTest:
+    """Drives ingestion and research Q&A with N simulated sessions per concurrency level"""
+    
+    def __init__(self, args: argparse.Namespace, stub: StubOllama, workdir: str):
+        self.args = args
+        self.stub = stub
+        self.workdir = workdir
+        self.recorder = LatencyRecorder()
+        self._build_services()
+    
+    def _build_services(self) -> None:
+        # Imported late so the stub's OLLAMA_BASE_URL is picked up by the LLM client
+        import pipelines.ingestion_pipeline as ingestion_module
+        from agents.research_agent import ResearchAgentService
+        from services.text_processor import create_text_processor
+        from services.topic_index_service import FileTopicIndexStore, TopicIndexService
+        from services.vector_store_service import create_vector_store_service
+        
+        self.vector_store_service = create_vector_store_service(
+            persist_directory=os.path.join(self.workdir, "vectors"), backend=self.args.backend
+        )
+        store = self.vector_store_service.vector_store
+        store.embedding = _TimedEmbeddings(store.embedding, self.recorder)
+        self.vector_store_service.store_chunks = self.recorder.timed(
+            "vector_store_write", self.vector_store_service.store_chunks
+        )
+        self.vector_store_service.get_query_chunks = self.recorder.timed(
+            "vector_store_query", self.vector_store_service.get_query_chunks
+        )
+        ingestion_module.extract_and_chunk_pdf = self.recorder.timed(
+            "pdf_extract_chunk", ingestion_module.extract_and_chunk_pdf
+        )
+        
+        topic_index_service = TopicIndexService(FileTopicIndexStore(os.path.join(self.workdir, "topics")))
+        self.pipeline = ingestion_module.IngestionPipeline(
+            create_text_processor(), self.vector_store_service, topic_index_service
+        )
+        self.research_service = ResearchAgentService(
+            vector_store_service=self.vector_store_service, enable_prefetch=False
+        )
+    
+    def _session(self, session_number: int, level: int) -> List[str]:
+        chat_id = f"load-{level}-{session_number}"
+        errors = []
+        try:
+            started = time.perf_counter()
+            self.pipeline.process_document(self.args.pdf, chat_id, generate_summaries=not self.args.skip_summaries)
+            self.recorder.record("op_ingest", time.perf_counter() - started)
+        except Exception as e:
+            errors.append(f"{chat_id} ingest: {e}")
+            return errors
+        for i in range(self.args.questions):
+            question = QUESTIONS[(session_number + i) % len(QUESTIONS)]
+            try:
+                started = time.perf_counter()
+                self.research_service.ask_question(question=question, chat_id=chat_id)
+                self.recorder.record("op_ask", time.perf_counter() - started)
+            except Exception as e:
+                errors.append(f"{chat_id} ask: {e}")
+        return errors
+    
+    def run_level(self, concurrency: int) -> LevelResult:
+        self.recorder.reset()
+        self.stub.recorder.reset()
+        self.stub.reset_busy()
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(lambda n: self._session(n, concurrency), range(concurrency)))
+        
+        wall = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+        samples = self.recorder.reset()
+        samples.update(self.stub.recorder.reset())
+        return LevelResult(
+            concurrency=concurrency,
+            wall_seconds=wall,
+            operations={k[3:]: v for k, v in samples.items() if k.startswith("op_")},
+            components={k: v for k, v in samples.items() if not k.startswith("op_")},
+            llm_utilization=self.stub.reset_busy() / (wall * self.stub.slots),
+            cpu_utilization=cpu / (wall * (os.cpu_count() or 1)),
+            errors=[error for errors in outcomes for error in errors]
+        )
+
+
+class _TimedEmbeddings:
+    """Embedding proxy that records encoder latency"""
+    
+    def __init__(self, embedding, recorder: LatencyRecorder):
+        self.embedding = embedding
+        self.embed_documents = recorder.timed("embedding", embedding.embed_documents)
+        self.embed_query = recorder.timed("embedding", embedding.embed_query)
+    
+    def __getattr__(self, name):
+        return getattr(self.embedding, name)
+
+
+def print_level(result: LevelResult) -> None:
+    print(f"\n=== {result.concurrency} concurrent session(s) — {result.wall_seconds:.1f}s wall ===")
+    print(f"{'operation':<22}{'count':>7}{'ops/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, values in sorted(result.operations.items()):
+        print(
+            f"{name:<22}{len(values):>7}{len(values) / result.wall_seconds:>9.2f}"
+            f"{percentile(values, 0.5):>8.2f}s{percentile(values, 0.95):>8.2f}s{percentile(values, 0.99):>8.2f}s"
+        )
+    print(f"{'component':<22}{'calls':>7}{'busy %':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, values in sorted(result.components.items()):
+        # Busy share of wall-clock summed over threads; >100% means calls overlap
+        busy = sum(values) / result.wall_seconds * 100
+        print(
+            f"{name:<22}{len(values):>7}{busy:>8.0f}%"
+            f"{percentile(values, 0.5):>8.3f}s{percentile(values, 0.95):>8.3f}s{percentile(values, 0.99):>8.3f}s"
+        )
+    print(f"LLM slot utilization: {result.llm_utilization:.0%} · process CPU utilization: {result.cpu_utilization:.0%}")
+    if result.errors:
+        print(f"{len(result.errors)} error(s), first: {result.errors[0]}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Simulate concurrent EduAgent sessions against a stub LLM and report latency per component."
+    )
+    parser.add_argument("--levels", default="1,2,4,8", help="Comma-separated concurrency levels to ramp through")
+    parser.add_argument("--questions", type=int, default=3, help="Questions asked per session after ingestion")
+    parser.add_argument("--pdf", default=None, help="PDF to ingest (default: a generated one)")
+    parser.add_argument("--pages", type=int, default=10, help="Pages of the generated PDF")
+    parser.add_argument("--backend", default="chroma", choices=["chroma", "numpy"])
+    parser.add_argument("--skip-summaries", action="store_true", help="Ingest without the LLM summary stages")
+    parser.add_argument("--llm-parallel", type=int, default=1, help="Concurrent requests the stub LLM serves")
+    parser.add_argument("--llm-first-token-ms", type=float, default=300.0)
+    parser.add_argument("--llm-per-token-ms", type=float, default=20.0)
+    parser.add_argument("--llm-tokens", type=int, default=60, help="Tokens per stub reply")
+    parser.add_argument("--port", type=int, default=0, help="Stub LLM port (default: any free port)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    stub = StubOllama(args.port, args.llm_parallel, args.llm_first_token_ms, args.llm_per_token_ms, args.llm_tokens)
+    stub.start()
+    os.environ["OLLAMA_BASE_URL"] = stub.base_url
+    os.environ.setdefault("EDUAGENT_OCR", "0")
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.pdf is None:
+            args.pdf = os.path.join(workdir, "synthetic.pdf")
+            make_synthetic_pdf(args.pdf, args.pages)
+        
+        load_test = LoadTest(args, stub, workdir)
+        print(f"Stub LLM at {stub.base_url} ({args.llm_parallel} slot(s)); backend: {args.backend}")
+        for level in [int(value) for value in args.levels.split(",") if value.strip()]:
+            print_level(load_test.run_level(level))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Set
+
+# Make sure Python can find other app modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain.prompts import ChatPromptTemplate
+from llm.llm_client import LLMFactory, ModelCascade, ModelSpec, LARGE_MODEL, SMALL_MODEL, model_usage_stats
+from services.topic_index_service import parse_topic_labels
+from tools.pdf_chunk_loader import extract_and_chunk_pdf
+
+PROMPT = ChatPromptTemplate.from_template("""
+You are a research assistant. From the text below, extract:
+- Main Topics
+- Techniques/Methods used
+- Keywords
+
+TEXT:
+{text}
+""")
+
+
+def load_corpus(root_dir: str, max_chunks: int) -> Dict[str, str]:
+    """Read the first chunks of each PDF under root_dir"""
+    corpus = {}
+    for root, _, files in os.walk(root_dir):
+        for name in sorted(files):
+            if name.lower().endswith(".pdf"):
+                path = os.path.join(root, name)
+                corpus[path] = "\n\n".join(extract_and_chunk_pdf(path)[:max_chunks])
+    return corpus
+
+
+def label_set(text: str) -> Set[str]:
+    return {label.casefold() for label in parse_topic_labels(text)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare latency and agreement of the small model, the large model and the cascade."
+    )
+    parser.add_argument("corpus_dir", help="Directory of benchmark PDFs")
+    parser.add_argument("--max-chunks", type=int, default=6, help="Chunks of each document sent to the model")
+    parser.add_argument("--small-model", default=SMALL_MODEL)
+    parser.add_argument("--large-model", default=LARGE_MODEL)
+    args = parser.parse_args(argv)
+    
+    large = ModelSpec(model=args.large_model, temperature=0.1)
+    small = ModelSpec(model=args.small_model, temperature=0.1)
+    LLMFactory.register_task_model("bench_large", large)
+    LLMFactory.register_task_model("bench_small", small)
+    LLMFactory.register_task_model("bench_cascade", ModelSpec(model=args.small_model, temperature=0.1, escalate_to=large))
+    
+    corpus = load_corpus(args.corpus_dir, args.max_chunks)
+    if not corpus:
+        print("No PDFs found.")
+        return
+    
+    accept = lambda result: len(parse_topic_labels(result)) >= 3
+    latencies: Dict[str, List[float]] = {"bench_large": [], "bench_small": [], "bench_cascade": []}
+    agreement: Dict[str, List[float]] = {"bench_small": [], "bench_cascade": []}
+    
+    for path, text in corpus.items():
+        prompt = PROMPT.format(text=text)
+        outputs = {}
+        for task in latencies:
+            started = time.perf_counter()
+            outputs[task] = ModelCascade(task).invoke(prompt, accept=accept)
+            latencies[task].append(time.perf_counter() - started)
+        reference = label_set(outputs["bench_large"])
+        for task in agreement:
+            agreement[task].append(jaccard(label_set(outputs[task]), reference))
+        print(f"✅ {os.path.basename(path)}")
+    
+    print(f"\n{'tier':<16}{'p50 latency':>14}{'mean latency':>14}{'label overlap vs large':>26}")
+    for task, values in latencies.items():
+        overlap = f"{statistics.mean(agreement[task]):.2f}" if task in agreement else "1.00 (reference)"
+        print(f"{task[6:]:<16}{statistics.median(values):>13.2f}s{statistics.mean(values):>13.2f}s{overlap:>26}")
+    
+    cascade_stats = {k: v for k, v in model_usage_stats.snapshot().items() if k.startswith("bench_cascade")}
+    for key, value in cascade_stats.items():
+        print(f"{key}: {int(value['calls'])} calls, {int(value['rejected'])} rejected (escalated)")
+
+
+if __name__ == "__main__":
+    main()
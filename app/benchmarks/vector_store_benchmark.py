@@ -0,0 +1,96 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+# Make sure Python can find other app modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.vector_store_service import ChromaVectorStore, VectorStoreService, get_embeddings
+from services.numpy_vector_store import NumpyVectorStore
+
+
+class CachedEmbeddings:
+    """Memoizes embeddings so the benchmark times the index, not the encoder"""
+    
+    def __init__(self, embedding):
+        self.embedding = embedding
+        self._cache: Dict[str, List[float]] = {}
+    
+    def warm(self, texts: List[str]) -> None:
+        missing = [t for t in dict.fromkeys(texts) if t not in self._cache]
+        if missing:
+            self._cache.update(zip(missing, self.embedding.embed_documents(missing)))
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.warm(texts)
+        return [self._cache[t] for t in texts]
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def synthetic_corpus(count: int, seed: int = 7) -> List[str]:
+    """Generate pseudo-academic chunks from a fixed vocabulary"""
+    vocabulary = (
+        "model data training evaluation network attention gradient loss dataset baseline "
+        "accuracy transformer embedding retrieval query document method result analysis "
+        "experiment benchmark latency memory vector index cosine similarity layer optimizer"
+    ).split()
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(vocabulary) for _ in range(120)) for _ in range(count)]
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def run_backend(name: str, service: VectorStoreService, chunks: List[str], queries: List[str], top_k: int) -> None:
+    chat_id = "benchmark"
+    started = time.perf_counter()
+    service.store_chunks(chat_id, chunks, {"source": "benchmark"}, chunk_ids=[str(i) for i in range(len(chunks))])
+    ingest_seconds = time.perf_counter() - started
+    
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        service.get_query_chunks(chat_id, query, top_k=top_k)
+        latencies.append((time.perf_counter() - started) * 1000)
+    
+    print(
+        f"{name:<16} ingest {ingest_seconds * 1000:9.1f} ms "
+        f"({len(chunks) / ingest_seconds:8.0f} chunks/s) | "
+        f"query p50 {statistics.median(latencies):7.2f} ms  p95 {percentile(latencies, 0.95):7.2f} ms"
+    )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compare Chroma and NumPy vector store latency.")
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=4)
+    args = parser.parse_args(argv)
+    
+    chunks = synthetic_corpus(args.chunks)
+    queries = synthetic_corpus(args.queries, seed=11)
+    embedding = CachedEmbeddings(get_embeddings())
+    print(f"Embedding {len(chunks)} chunks and {len(queries)} queries (excluded from timings)...")
+    embedding.warm(chunks + queries)
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        chroma = ChromaVectorStore(os.path.join(workdir, "chroma"))
+        chroma.embedding = embedding
+        run_backend("chroma", VectorStoreService(chroma), chunks, queries, args.top_k)
+        
+        for dtype in ("float32", "float16", "int8"):
+            store = NumpyVectorStore(os.path.join(workdir, f"numpy-{dtype}"), dtype=dtype, embedding=embedding)
+            run_backend(f"numpy-{dtype}", VectorStoreService(store), chunks, queries, args.top_k)
+
+
+if __name__ == "__main__":
+    main()
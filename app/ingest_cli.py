@@ -0,0 +1,53 @@
+import argparse
+import os
+import sys
+
+# Make sure Python can find other app modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from pipelines.batch_ingestion import DEFAULT_COLLECTION, BatchIngestionConfig, BatchIngestionRunner
+from pipelines.ingestion_pipeline import create_ingestion_pipeline
+from services.session_store import get_session_store
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Bulk-ingest a directory tree of course-material PDFs into EduAgent."
+    )
+    parser.add_argument("root_dir", help="Directory to scan recursively for PDFs")
+    parser.add_argument("--chat-id", default=DEFAULT_COLLECTION,
+                        help="Collection (chat ID) the chunks are stored under; restore it in the app by this ID")
+    parser.add_argument("--workers", type=int, default=4, help="Number of parallel ingestion workers")
+    parser.add_argument("--manifest", default=None,
+                        help="Manifest path used to resume (default: <root_dir>/.eduagent_manifest.jsonl)")
+    parser.add_argument("--defer-summaries", action="store_true",
+                        help="Skip LLM summaries/topics now; run them later with --backfill-summaries")
+    parser.add_argument("--backfill-summaries", action="store_true",
+                        help="Only run the deferred LLM summary stage for previously ingested files")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not os.path.isdir(args.root_dir):
+        print(f"❌ Not a directory: {args.root_dir}")
+        return 2
+    
+    config = BatchIngestionConfig(
+        root_dir=args.root_dir,
+        chat_id=args.chat_id,
+        workers=max(1, args.workers),
+        manifest_path=args.manifest,
+        defer_summaries=args.defer_summaries
+    )
+    runner = BatchIngestionRunner(create_ingestion_pipeline(), config, get_session_store())
+    report = runner.backfill_summaries() if args.backfill_summaries else runner.run()
+    
+    print(report.format())
+    print(f"🔁 Open the app with ?chat_id={config.chat_id} or restore session '{config.chat_id}' to query it")
+    return 1 if report.failed else 0
+
+
+# Command-line entry point
+if __name__ == "__main__":
+    sys.exit(main())
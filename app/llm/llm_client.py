@@ -2,9 +2,44 @@
 from abc import ABC, abstractmethod
 from langchain_community.llms import Ollama
 from langchain_core.language_models.llms import LLM
+from dataclasses import dataclass, replace
 from functools import lru_cache
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional
+import json
 import os
+import threading
+import time
+import requests
+
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://ollama:11434")
+LARGE_MODEL = os.environ.get("EDUAGENT_LARGE_MODEL", "mistral")
+SMALL_MODEL = os.environ.get("EDUAGENT_SMALL_MODEL", "qwen2.5:1.5b")
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """Model and sampling parameters for one LLM task, with an optional escalation target"""
+    model: str = LARGE_MODEL
+    temperature: float = 0.4
+    provider: str = "ollama"
+    base_url: str = OLLAMA_BASE_URL
+    escalate_to: Optional["ModelSpec"] = None
+    
+    def llm_kwargs(self) -> Dict[str, Any]:
+        return {"model": self.model, "temperature": self.temperature, "base_url": self.base_url}
+
+_LARGE = ModelSpec()
+
+# Classification-like steps run on the small model and escalate to the large one on low confidence
+DEFAULT_TASK_MODELS: Dict[str, ModelSpec] = {
+    "default": _LARGE,
+    "summarization": _LARGE,
+    "research_answer": _LARGE,
+    "exam_recommendations": _LARGE,
+    "topic_extraction": ModelSpec(model=SMALL_MODEL, temperature=0.1, escalate_to=_LARGE),
+    "question_topics": ModelSpec(model=SMALL_MODEL, temperature=0.1, escalate_to=_LARGE),
+    "query_rewrite": ModelSpec(model=SMALL_MODEL, temperature=0.0, escalate_to=_LARGE),
+    "memory_summary": ModelSpec(model=SMALL_MODEL, temperature=0.2, escalate_to=_LARGE),
+}
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers (Strategy Pattern)"""
@@ -16,7 +51,7 @@ class LLMProvider(ABC):
 class OllamaProvider(LLMProvider):
     """Concrete implementation for Ollama with CrewAI compatibility"""
     
-    def create_llm(self, model: str = "mistral", temperature: float = 0.4, base_url: str = "http://ollama:11434") -> LLM:
+    def create_llm(self, model: str = "mistral", temperature: float = 0.4, base_url: str = OLLAMA_BASE_URL) -> LLM:
         return Ollama(
             model=model,
             temperature=temperature,
@@ -33,6 +68,8 @@ class LLMFactory:
         "ollama": OllamaProvider()
     }
     
+    _task_models: Dict[str, ModelSpec] = dict(DEFAULT_TASK_MODELS)
+    
     @classmethod
     def register_provider(cls, name: str, provider: LLMProvider):
         """Register a new LLM provider"""
@@ -45,19 +82,127 @@ class LLMFactory:
             raise ValueError(f"Unknown provider: {provider_name}")
         
         return cls._providers[provider_name].create_llm(**kwargs)
+    
+    @classmethod
+    def register_task_model(cls, task: str, spec: ModelSpec):
+        """Map a task name to the model that should serve it"""
+        cls._task_models[task] = spec
+    
+    @classmethod
+    def get_task_spec(cls, task: str) -> ModelSpec:
+        """Resolve the model spec for a task, falling back to the default spec"""
+        return cls._task_models.get(task, cls._task_models["default"])
+    
+    @classmethod
+    def load_task_models_from_env(cls, variable: str = "EDUAGENT_TASK_MODELS"):
+        """
+        Apply overrides from a JSON mapping such as
+        ``{"topic_extraction": {"model": "llama3.2:1b", "temperature": 0.0, "escalate_to": "mistral"}}``.
+        """
+        raw = os.environ.get(variable)
+        if not raw:
+            return
+        for task, params in json.loads(raw).items():
+            params = dict(params)
+            escalate_to = params.pop("escalate_to", None)
+            spec = replace(cls.get_task_spec(task), escalate_to=None, **params)
+            if escalate_to:
+                spec = replace(spec, escalate_to=ModelSpec(model=escalate_to))
+            cls.register_task_model(task, spec)
+
+LLMFactory.load_task_models_from_env()
 
 @lru_cache(maxsize=1)
 def get_llm(provider: str = "ollama", **kwargs) -> LLM:
     """Get cached LLM instance"""
     return LLMFactory.create_llm(provider, **kwargs)
 
+@lru_cache(maxsize=16)
+def _get_llm_for_spec(spec: ModelSpec) -> LLM:
+    return LLMFactory.create_llm(spec.provider, **spec.llm_kwargs())
+
+def get_llm_for_task(task: str) -> LLM:
+    """Get the cached LLM instance configured for a task"""
+    return _get_llm_for_spec(LLMFactory.get_task_spec(task))
+
+def get_crewai_llm_for_task(task: str):
+    """Get the cached CrewAI-compatible LLM configured for a task"""
+    spec = LLMFactory.get_task_spec(task)
+    return get_crewai_llm(model=spec.model, temperature=spec.temperature, base_url=spec.base_url)
+
+class ModelUsageStats:
+    """Thread-safe latency and escalation counters per (task, model)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+    
+    def record(self, task: str, model: str, seconds: float, accepted: bool) -> None:
+        with self._lock:
+            entry = self._stats.setdefault(f"{task}:{model}", {"calls": 0, "seconds": 0.0, "rejected": 0})
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            entry["rejected"] += 0 if accepted else 1
+    
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                key: {**value, "avg_seconds": value["seconds"] / value["calls"] if value["calls"] else 0.0}
+                for key, value in self._stats.items()
+            }
+
+model_usage_stats = ModelUsageStats()
+
+class ModelCascade:
+    """
+    Runs a task on its configured (usually small) model first and escalates along
+    ``escalate_to`` when the ``accept`` check judges the answer low-confidence or
+    the model call fails (e.g. the small model was never pulled).
+    """
+    
+    def __init__(self, task: str, stats: Optional[ModelUsageStats] = None):
+        self.task = task
+        self.stats = stats or model_usage_stats
+    
+    def _tiers(self) -> List[ModelSpec]:
+        tiers = []
+        spec: Optional[ModelSpec] = LLMFactory.get_task_spec(self.task)
+        while spec is not None and spec not in tiers:
+            tiers.append(spec)
+            spec = spec.escalate_to
+        return tiers
+    
+    def invoke(self, prompt: str, accept: Callable[[str], bool] = lambda result: bool(result.strip())) -> str:
+        tiers = self._tiers()
+        result = ""
+        for i, spec in enumerate(tiers):
+            started = time.perf_counter()
+            try:
+                result = str(_get_llm_for_spec(spec).invoke(prompt))
+            except Exception as e:
+                self.stats.record(self.task, spec.model, time.perf_counter() - started, False)
+                if i + 1 == len(tiers):
+                    raise
+                print(f"⚠️ {self.task} failed on {spec.model}: {e}")
+                print(f"⤴️ Escalating {self.task} from {spec.model} to {tiers[i + 1].model}")
+                continue
+            accepted = accept(result)
+            self.stats.record(self.task, spec.model, time.perf_counter() - started, accepted)
+            if accepted:
+                return result
+            if i + 1 < len(tiers):
+                print(f"⤴️ Escalating {self.task} from {spec.model} to {tiers[i + 1].model}")
+        return result
+
 # CrewAI-specific configuration
-def get_crewai_llm(model: str = "mistral", temperature: float = 0.4, base_url: str = "http://ollama:11434"):
+@lru_cache(maxsize=8)
+def get_crewai_llm(model: str = "mistral", temperature: float = 0.4, base_url: str = OLLAMA_BASE_URL):
     """
     Get an LLM instance specifically configured for CrewAI.
     
     This function creates an LLM that works with CrewAI by using the proper
-    model identifier format that litellm expects.
+    model identifier format that litellm expects. Instances are cached per
+    (model, temperature, base_url) so agents across sessions share one handle.
     """
     # Set environment variable for CrewAI/litellm compatibility
     os.environ["OLLAMA_BASE_URL"] = base_url
@@ -71,4 +216,31 @@ def get_crewai_llm(model: str = "mistral", temperature: float = 0.4, base_url: s
         keep_alive=True
     )
     
-    return llm
\ No newline at end of file
+    return llm
+
+_last_warm_up: Dict[str, float] = {}
+
+def warm_up_model(model: str = "mistral", 
+                  base_url: str = OLLAMA_BASE_URL, 
+                  keep_alive: str = "10m",
+                  min_interval_seconds: float = 60.0) -> bool:
+    """
+    Ask Ollama to load the model (an empty generate request) and keep it resident,
+    so the first real request does not pay the model load time. Pings are throttled
+    per model and failures are ignored since this is only an optimization.
+    """
+    now = time.monotonic()
+    key = f"{base_url}/{model}"
+    if now - _last_warm_up.get(key, float("-inf")) < min_interval_seconds:
+        return False
+    _last_warm_up[key] = now
+    try:
+        requests.post(
+            f"{base_url}/api/generate",
+            json={"model": model, "keep_alive": keep_alive},
+            timeout=5
+        )
+        return True
+    except requests.RequestException as e:
+        print(f"Model warm-up failed: {e}")
+        return False
@@ -0,0 +1,259 @@
+# app/pipelines/batch_ingestion.py
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Tuple
+from pipelines.ingestion_pipeline import IngestionPipeline, IngestionResult
+from services.session_store import SQLiteSessionStore, StoredDocument
+from tools.pdf_chunk_loader import count_pdf_pages
+from utils.file_handler import compute_file_hash
+
+DEFAULT_COLLECTION = "course-materials"
+
+@dataclass
+class BatchIngestionConfig:
+    """Configuration for bulk ingestion of a directory tree"""
+    root_dir: str
+    chat_id: str = DEFAULT_COLLECTION
+    workers: int = 4
+    manifest_path: Optional[str] = None
+    defer_summaries: bool = False
+    extensions: tuple = (".pdf",)
+    
+    def resolved_manifest_path(self) -> str:
+        return self.manifest_path or os.path.join(self.root_dir, ".eduagent_manifest.jsonl")
+
+@dataclass
+class ManifestEntry:
+    """One line of the ingestion manifest"""
+    path: str
+    document_id: str
+    status: str
+    pages: int = 0
+    chunks: int = 0
+    summaries_deferred: bool = False
+    seconds: float = 0.0
+    error: str = ""
+    # Entries written before collections were recorded belong to the default one
+    chat_id: str = DEFAULT_COLLECTION
+    
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.chat_id, self.document_id
+
+@dataclass
+class BatchIngestionReport:
+    """Outcome and throughput of a batch run"""
+    ingested: int = 0
+    skipped: int = 0
+    failed: int = 0
+    pages: int = 0
+    chunks: int = 0
+    elapsed_seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+    
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed_seconds if self.elapsed_seconds else 0.0
+    
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.elapsed_seconds if self.elapsed_seconds else 0.0
+    
+    def format(self) -> str:
+        return (
+            f"Ingested {self.ingested} file(s), skipped {self.skipped}, failed {self.failed} "
+            f"in {self.elapsed_seconds:.1f}s\n"
+            f"Pages: {self.pages} ({self.pages_per_second:.2f} pages/s)\n"
+            f"Chunks: {self.chunks} ({self.chunks_per_second:.2f} chunks/s)"
+        )
+
+class IngestionManifest:
+    """
+    Append-only JSONL manifest of processed files.
+
+    The last entry per (chat ID, document ID) wins, so a run interrupted at any
+    point resumes by skipping documents already recorded as done for that
+    collection, while ingesting the same tree into another collection does not.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], ManifestEntry] = self._load()
+    
+    def _load(self) -> Dict[Tuple[str, str], ManifestEntry]:
+        entries: Dict[Tuple[str, str], ManifestEntry] = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = ManifestEntry(**json.loads(line))
+                except (ValueError, TypeError):
+                    # Ignore a torn final line from an interrupted run
+                    continue
+                entries[entry.key] = entry
+        return entries
+    
+    def get(self, chat_id: str, document_id: str) -> Optional[ManifestEntry]:
+        return self._entries.get((chat_id, document_id))
+    
+    def is_done(self, chat_id: str, document_id: str) -> bool:
+        entry = self.get(chat_id, document_id)
+        return entry is not None and entry.status == "done"
+    
+    def pending_summaries(self, chat_id: str) -> List[ManifestEntry]:
+        return [
+            e for e in self._entries.values() 
+            if e.chat_id == chat_id and e.status == "done" and e.summaries_deferred
+        ]
+    
+    def record(self, entry: ManifestEntry) -> None:
+        with self._lock:
+            self._entries[entry.key] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(entry)) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+class BatchIngestionRunner:
+    """
+    Ingests a directory tree through an IngestionPipeline with a worker pool.
+
+    With a session store, each document is also registered under the
+    collection's chat ID, so the app can restore it as a session.
+    """
+    
+    def __init__(self, 
+                 pipeline: IngestionPipeline, 
+                 config: BatchIngestionConfig,
+                 session_store: Optional[SQLiteSessionStore] = None):
+        self.pipeline = pipeline
+        self.config = config
+        self.session_store = session_store
+        self.manifest = IngestionManifest(config.resolved_manifest_path())
+    
+    def _register(self, path: str, result: IngestionResult) -> None:
+        """Record the document (and its summary/topics, once generated) for session restore"""
+        if self.session_store is None:
+            return
+        self.session_store.save_document(self.config.chat_id, StoredDocument(
+            document_id=result.document_id,
+            source=os.path.basename(path),
+            summary=result.summary,
+            topics=result.topics,
+            chunk_count=result.chunk_count
+        ))
+    
+    def discover_files(self) -> List[str]:
+        """List matching files under the root directory in a stable order"""
+        found = []
+        for root, _, files in os.walk(self.config.root_dir):
+            for name in files:
+                if name.lower().endswith(self.config.extensions):
+                    found.append(os.path.join(root, name))
+        return sorted(found)
+    
+    def _ingest_file(self, path: str, document_id: str) -> ManifestEntry:
+        started = time.perf_counter()
+        try:
+            pages = count_pdf_pages(path)
+            result = self.pipeline.process_document(
+                file_path=path,
+                chat_id=self.config.chat_id,
+                document_id=document_id,
+                generate_summaries=not self.config.defer_summaries
+            )
+            self._register(path, result)
+            entry = ManifestEntry(
+                path=path,
+                document_id=document_id,
+                status="done",
+                pages=pages,
+                chunks=result.chunk_count,
+                summaries_deferred=self.config.defer_summaries,
+                chat_id=self.config.chat_id
+            )
+        except Exception as e:
+            entry = ManifestEntry(
+                path=path, document_id=document_id, status="failed", error=str(e), chat_id=self.config.chat_id
+            )
+        entry.seconds = time.perf_counter() - started
+        self.manifest.record(entry)
+        return entry
+    
+    def _collect(self, futures, report: BatchIngestionReport) -> None:
+        for future in as_completed(futures):
+            entry = future.result()
+            if entry.status == "done":
+                report.ingested += 1
+                report.pages += entry.pages
+                report.chunks += entry.chunks
+                print(f"✅ {entry.path}: {entry.pages} pages, {entry.chunks} chunks ({entry.seconds:.1f}s)")
+            else:
+                report.failed += 1
+                report.errors.append(f"{entry.path}: {entry.error}")
+                print(f"❌ {entry.path}: {entry.error}")
+    
+    def run(self) -> BatchIngestionReport:
+        """Ingest every file not already recorded in the manifest"""
+        report = BatchIngestionReport()
+        started = time.perf_counter()
+        
+        pending = []
+        seen = set()
+        for path in self.discover_files():
+            document_id = compute_file_hash(path)
+            if self.manifest.is_done(self.config.chat_id, document_id) or document_id in seen:
+                report.skipped += 1
+                continue
+            seen.add(document_id)
+            pending.append((path, document_id))
+        
+        print(f"📚 {len(pending)} file(s) to ingest, {report.skipped} already indexed")
+        with ThreadPoolExecutor(max_workers=self.config.workers) as executor:
+            futures = [executor.submit(self._ingest_file, path, doc_id) for path, doc_id in pending]
+            self._collect(futures, report)
+        
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
+    
+    def _summarize_entry(self, entry: ManifestEntry) -> ManifestEntry:
+        started = time.perf_counter()
+        try:
+            result = self.pipeline.summarize_document(entry.path, entry.document_id)
+            self._register(entry.path, result)
+            updated = ManifestEntry(**{**asdict(entry), "summaries_deferred": False})
+        except Exception as e:
+            updated = ManifestEntry(**{**asdict(entry), "error": str(e)})
+        updated.seconds = time.perf_counter() - started
+        self.manifest.record(updated)
+        return updated
+    
+    def backfill_summaries(self) -> BatchIngestionReport:
+        """Run the deferred LLM summary stage for documents ingested without it"""
+        report = BatchIngestionReport()
+        started = time.perf_counter()
+        pending = self.manifest.pending_summaries(self.config.chat_id)
+        
+        print(f"📝 {len(pending)} document(s) awaiting summaries")
+        with ThreadPoolExecutor(max_workers=self.config.workers) as executor:
+            futures = [executor.submit(self._summarize_entry, entry) for entry in pending]
+            for future in as_completed(futures):
+                entry = future.result()
+                if entry.summaries_deferred:
+                    report.failed += 1
+                    report.errors.append(f"{entry.path}: {entry.error}")
+                    print(f"❌ {entry.path}: {entry.error}")
+                else:
+                    report.ingested += 1
+                    report.pages += entry.pages
+                    report.chunks += entry.chunks
+                    print(f"✅ {entry.path}: summarized ({entry.seconds:.1f}s)")
+        
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
@@ -1,45 +1,86 @@
 import os
 from dataclasses import dataclass
+from typing import List, Optional, Tuple
 from tools.pdf_chunk_loader import extract_and_chunk_pdf
 from services.text_processor import TextProcessorService
-from services.vector_store_service import VectorStoreService, create_vector_store_service
+from services.vector_store_service import VectorStoreService, create_vector_store_service, make_chunk_ids
+from services.topic_index_service import TopicIndexService, parse_topic_labels
+from utils.file_handler import compute_file_hash
 
 @dataclass
 class IngestionResult:
     summary: str
     topics: str
     chunk_count: int
+    document_id: Optional[str] = None
 
 class IngestionPipeline:
     
     def __init__(self, 
                  text_processor: TextProcessorService,
-                 vector_store_service: VectorStoreService):
+                 vector_store_service: VectorStoreService,
+                 topic_index_service: Optional[TopicIndexService] = None):
         self.text_processor = text_processor
         self.vector_store_service = vector_store_service
+        self.topic_index_service = topic_index_service
     
-    def process_document(self, file_path: str, chat_id: str) -> IngestionResult:
+    def process_document(self, 
+                         file_path: str, 
+                         chat_id: str, 
+                         document_id: Optional[str] = None,
+                         generate_summaries: bool = True) -> IngestionResult:
+        # Reuse the hash computed while the upload was streamed to disk when available
+        document_id = document_id or compute_file_hash(file_path)
+        
         # Extract and chunk the PDF
         chunks = extract_and_chunk_pdf(file_path)
         
-        # Process text for summary and topics
-        summary = self.text_processor.summarize_text(chunks)
-        topics = self.text_processor.extract_topics(chunks)
-        
         # Store chunks in vector database
-        metadata = {"source": os.path.basename(file_path)}
-        self.vector_store_service.store_chunks(chat_id, chunks, metadata)
+        chunk_ids = make_chunk_ids(document_id, len(chunks))
+        metadata = {"source": os.path.basename(file_path), "document_id": document_id}
+        self.vector_store_service.store_chunks(chat_id, chunks, metadata, chunk_ids=chunk_ids)
+        
+        summary, topics = "", ""
+        if generate_summaries:
+            summary, topics = self._summarize(file_path, document_id, chunks)
         
         return IngestionResult(
             summary=summary,
             topics=topics,
-            chunk_count=len(chunks)
+            chunk_count=len(chunks),
+            document_id=document_id
         )
+    
+    def summarize_document(self, file_path: str, document_id: Optional[str] = None) -> IngestionResult:
+        """Run the LLM stages for a document whose chunks were stored with summaries deferred"""
+        document_id = document_id or compute_file_hash(file_path)
+        chunks = extract_and_chunk_pdf(file_path)
+        summary, topics = self._summarize(file_path, document_id, chunks)
+        return IngestionResult(
+            summary=summary,
+            topics=topics,
+            chunk_count=len(chunks),
+            document_id=document_id
+        )
+    
+    def _summarize(self, file_path: str, document_id: str, chunks: List[str]) -> Tuple[str, str]:
+        # Process text for summary and topics
+        summary = self.text_processor.summarize_text(chunks)
+        topics = self.text_processor.extract_topics(chunks)
+        
+        # Precompute the per-document topic index for exam matching
+        if self.topic_index_service and self.topic_index_service.get_index(document_id) is None:
+            self.topic_index_service.build_index(
+                document_id, os.path.basename(file_path), chunks, parse_topic_labels(topics)
+            )
+        return summary, topics
 
 def create_ingestion_pipeline() -> IngestionPipeline:
     from services.text_processor import create_text_processor
+    from services.topic_index_service import create_topic_index_service
     
     text_processor = create_text_processor()
     vector_store_service = create_vector_store_service()
+    topic_index_service = create_topic_index_service()
     
-    return IngestionPipeline(text_processor, vector_store_service)
\ No newline at end of file
+    return IngestionPipeline(text_processor, vector_store_service, topic_index_service)
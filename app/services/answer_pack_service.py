@@ -0,0 +1,151 @@
+# app/services/answer_pack_service.py
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from services.vector_store_service import get_embeddings
+
+DEFAULT_CANONICAL_QUESTIONS = (
+    "What is the main contribution of this paper?",
+    "What dataset was used?",
+    "Explain the methodology.",
+    "What are the key results?",
+    "What are the limitations of this work?",
+)
+
+def _questions_from_env() -> tuple:
+    raw = os.environ.get("EDUAGENT_ANSWER_PACK_QUESTIONS")
+    return tuple(json.loads(raw)) if raw else DEFAULT_CANONICAL_QUESTIONS
+
+@dataclass
+class AnswerPackConfig:
+    """Configuration for pre-generated answers to canonical questions"""
+    questions: tuple = field(default_factory=_questions_from_env)
+    similarity_threshold: float = 0.88
+    directory: str = "app/vectorstore/answer_packs"
+
+@dataclass
+class AnswerPack:
+    """Pre-generated answers for the current document of a chat"""
+    chat_id: str
+    document_id: str
+    questions: List[str]
+    answers: List[str]
+    embeddings: np.ndarray
+    created_at: float
+
+class AnswerPackService:
+    """
+    Builds and serves answer packs. Each chat keeps the pack of its most
+    recently ingested document, so canonical questions refer to that paper;
+    builds for a document that has since been replaced are discarded.
+    """
+    
+    def __init__(self, config: Optional[AnswerPackConfig] = None, embedding=None):
+        self.config = config or AnswerPackConfig()
+        self.embedding = embedding or get_embeddings()
+        self._packs: Dict[str, AnswerPack] = {}
+        self._expected: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.config.directory, exist_ok=True)
+    
+    def _path(self, chat_id: str) -> str:
+        return os.path.join(self.config.directory, f"{chat_id}.json")
+    
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.asarray(self.embedding.embed_documents(texts), dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    
+    def expect(self, chat_id: str, document_id: str) -> None:
+        """Drop the chat's current pack and only accept a new one built for ``document_id``"""
+        # Set first, so an older build finishing in between cannot publish
+        with self._lock:
+            self._expected[chat_id] = document_id
+        self.clear(chat_id)
+    
+    def _is_current(self, chat_id: str, document_id: str) -> bool:
+        expected = self._expected.get(chat_id)
+        return expected is None or expected == document_id
+    
+    def build_pack(self, chat_id: str, document_id: str, answer_fn: Callable[[str], str]) -> Optional[AnswerPack]:
+        """Answer every canonical question with ``answer_fn`` and persist the pack, unless superseded"""
+        questions = list(self.config.questions)
+        answers = []
+        for question in questions:
+            with self._lock:
+                current = self._is_current(chat_id, document_id)
+            if not current:
+                print(f"📦 Answer pack for {chat_id} superseded by a newer document; stopping")
+                return None
+            answers.append(answer_fn(question))
+        pack = AnswerPack(
+            chat_id=chat_id,
+            document_id=document_id,
+            questions=questions,
+            answers=answers,
+            embeddings=self._embed(questions),
+            created_at=time.time()
+        )
+        
+        tmp_path = f"{self._path(chat_id)}.{document_id}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "document_id": document_id,
+                "questions": questions,
+                "answers": answers,
+                "embeddings": pack.embeddings.tolist(),
+                "created_at": pack.created_at
+            }, f)
+        
+        # Check and publish atomically so an older build never overwrites a newer document's pack
+        with self._lock:
+            if not self._is_current(chat_id, document_id):
+                os.remove(tmp_path)
+                print(f"📦 Discarding answer pack for {chat_id}: document {document_id[:12]} was replaced")
+                return None
+            os.replace(tmp_path, self._path(chat_id))
+            self._packs[chat_id] = pack
+        return pack
+    
+    def get_pack(self, chat_id: str) -> Optional[AnswerPack]:
+        with self._lock:
+            if chat_id in self._packs:
+                return self._packs[chat_id]
+        path = self._path(chat_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        pack = AnswerPack(
+            chat_id=chat_id,
+            document_id=data["document_id"],
+            questions=data["questions"],
+            answers=data["answers"],
+            embeddings=np.asarray(data["embeddings"], dtype=np.float32),
+            created_at=data["created_at"]
+        )
+        with self._lock:
+            self._packs[chat_id] = pack
+        return pack
+    
+    def lookup(self, chat_id: str, question: str) -> Optional[str]:
+        """Return the packed answer if the question matches a canonical one closely enough"""
+        pack = self.get_pack(chat_id)
+        if pack is None or not pack.questions:
+            return None
+        scores = pack.embeddings @ self._embed([question])[0]
+        best = int(scores.argmax())
+        if scores[best] < self.config.similarity_threshold:
+            return None
+        print(f"📦 Answer pack hit for {chat_id}: '{pack.questions[best]}' (similarity {scores[best]:.2f})")
+        return pack.answers[best]
+    
+    def clear(self, chat_id: str) -> None:
+        """Drop a chat's pack, e.g. when a new document replaces the current one"""
+        with self._lock:
+            self._packs.pop(chat_id, None)
+        if os.path.exists(self._path(chat_id)):
+            os.remove(self._path(chat_id))
@@ -0,0 +1,198 @@
+# app/services/conversation_memory.py
+import re
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from langchain.prompts import ChatPromptTemplate
+from llm.llm_client import ModelCascade
+
+# Pronouns and bare demonstratives ("how does that work?") a standalone query should not contain
+UNRESOLVED_REFERENCE = re.compile(
+    r"\b(?:it|its|they|them|their|theirs|he|him|his|she|her|hers)\b"
+    r"|\b(?:this|that|these|those)\b(?=\s*(?:$|[?.!,;]|(?:one|ones|is|are|was|were|does|do|did|mean|means|work|works)\b))",
+    re.IGNORECASE
+)
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for budgeting"""
+    return (len(text) + 3) // 4
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Trim text from the front so the most recent content fits the budget"""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[-max_chars:].split(" ", 1)[-1]
+
+@dataclass
+class MemoryConfig:
+    """Configuration for conversational memory"""
+    recent_turns: int = 2
+    summary_token_budget: int = 300
+    turn_token_budget: int = 400
+
+@dataclass
+class ConversationTurn:
+    """A single question/answer exchange"""
+    question: str
+    answer: str
+    
+    def render(self) -> str:
+        return f"User: {self.question}\nAssistant: {self.answer}"
+
+@dataclass
+class ConversationMemory:
+    """Rolling summary of older turns plus a short window of recent turns"""
+    summary: str = ""
+    turns: List[ConversationTurn] = field(default_factory=list)
+    
+    @property
+    def is_empty(self) -> bool:
+        return not self.summary and not self.turns
+    
+    def render(self) -> str:
+        """Render memory as prompt context"""
+        parts = []
+        if self.summary:
+            parts.append(f"Summary of earlier conversation:\n{self.summary}")
+        if self.turns:
+            parts.append("Recent turns:\n" + "\n".join(turn.render() for turn in self.turns))
+        return "\n\n".join(parts)
+
+class SummaryUpdater(ABC):
+    """Strategy for folding an evicted turn into the rolling summary"""
+    
+    @abstractmethod
+    def update(self, summary: str, turn: ConversationTurn, max_tokens: int) -> str:
+        pass
+
+class LLMSummaryUpdater(SummaryUpdater):
+    """Incrementally rewrites the summary with one new turn at a time"""
+    
+    def __init__(self):
+        self.cascade = ModelCascade("memory_summary")
+    
+    def update(self, summary: str, turn: ConversationTurn, max_tokens: int) -> str:
+        prompt = ChatPromptTemplate.from_template("""
+        You maintain a running summary of a conversation about a research paper.
+        Update the summary with the new exchange. Keep the facts, entities and
+        open questions the user cares about. Use at most {max_words} words.
+
+        CURRENT SUMMARY:
+        {summary}
+
+        NEW EXCHANGE:
+        {turn}
+
+        UPDATED SUMMARY:
+        """)
+        result = self.cascade.invoke(prompt.format(
+            summary=summary or "(empty)",
+            turn=turn.render(),
+            max_words=int(max_tokens * 0.75)
+        ))
+        return truncate_to_tokens(str(result).strip(), max_tokens)
+
+class QueryRewriter(ABC):
+    """Strategy for turning a follow-up question into a standalone query"""
+    
+    @abstractmethod
+    def rewrite(self, question: str, memory: ConversationMemory) -> str:
+        pass
+
+class LLMQueryRewriter(QueryRewriter):
+    """Uses the LLM to resolve references against the conversation memory"""
+    
+    def __init__(self):
+        self.cascade = ModelCascade("query_rewrite")
+    
+    @staticmethod
+    def _is_confident(result: str) -> bool:
+        """
+        A usable rewrite is a single, reasonably short query with no unresolved
+        references; a follow-up copied back unchanged still has its pronouns and fails.
+        """
+        first_line = result.strip().splitlines()[0] if result.strip() else ""
+        return 0 < len(first_line) <= 300 and not UNRESOLVED_REFERENCE.search(first_line)
+    
+    def rewrite(self, question: str, memory: ConversationMemory) -> str:
+        if memory.is_empty:
+            return question
+        
+        prompt = ChatPromptTemplate.from_template("""
+        Given the conversation below and a follow-up question, rewrite the
+        follow-up as a single standalone search query that can be understood
+        without the conversation. Return only the rewritten query.
+
+        CONVERSATION:
+        {history}
+
+        FOLLOW-UP QUESTION: {question}
+
+        STANDALONE QUERY:
+        """)
+        result = self.cascade.invoke(
+            prompt.format(history=memory.render(), question=question), accept=self._is_confident
+        ).strip()
+        return result.splitlines()[0].strip().strip('"') if result else question
+
+class ConversationMemoryService:
+    """Keeps per-chat memory bounded by a fixed token budget"""
+    
+    def __init__(self,
+                 config: Optional[MemoryConfig] = None,
+                 summary_updater: Optional[SummaryUpdater] = None,
+                 query_rewriter: Optional[QueryRewriter] = None):
+        self.config = config or MemoryConfig()
+        self.summary_updater = summary_updater or LLMSummaryUpdater()
+        self.query_rewriter = query_rewriter or LLMQueryRewriter()
+        self._memories: Dict[str, ConversationMemory] = {}
+        self._lock = threading.Lock()
+    
+    def get_memory(self, chat_id: str) -> ConversationMemory:
+        with self._lock:
+            return self._memories.setdefault(chat_id, ConversationMemory())
+    
+    def rewrite_query(self, chat_id: str, question: str) -> str:
+        """Return a standalone version of the question for retrieval"""
+        return self.query_rewriter.rewrite(question, self.get_memory(chat_id))
+    
+    def get_context(self, chat_id: str) -> str:
+        """Return the bounded conversation context for the answer prompt"""
+        return self.get_memory(chat_id).render()
+    
+    def add_turn(self, chat_id: str, question: str, answer: str) -> None:
+        """Record a turn, folding the oldest turns into the rolling summary"""
+        memory = self.get_memory(chat_id)
+        memory.turns.append(ConversationTurn(
+            question=truncate_to_tokens(question, self.config.turn_token_budget),
+            answer=truncate_to_tokens(answer, self.config.turn_token_budget)
+        ))
+        
+        while len(memory.turns) > self.config.recent_turns:
+            evicted = memory.turns.pop(0)
+            memory.summary = self.summary_updater.update(
+                memory.summary, evicted, self.config.summary_token_budget
+            )
+    
+    def clear(self, chat_id: str) -> None:
+        with self._lock:
+            self._memories.pop(chat_id, None)
+    
+    def seed(self, chat_id: str, turns: List[Tuple[str, str]]) -> None:
+        """Rebuild memory for a restored chat from its most recent turns, without LLM calls"""
+        recent = turns[-self.config.recent_turns:] if self.config.recent_turns else []
+        memory = ConversationMemory(turns=[
+            ConversationTurn(
+                question=truncate_to_tokens(question, self.config.turn_token_budget),
+                answer=truncate_to_tokens(answer, self.config.turn_token_budget)
+            )
+            for question, answer in recent
+        ])
+        with self._lock:
+            self._memories[chat_id] = memory
+
+def create_conversation_memory_service(config: Optional[MemoryConfig] = None) -> ConversationMemoryService:
+    """Create a conversation memory service with LLM-backed strategies"""
+    return ConversationMemoryService(config)
@@ -0,0 +1,277 @@
+# app/services/numpy_vector_store.py
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from langchain.schema.document import Document
+from services.vector_store_service import VectorStoreInterface, get_embeddings
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+@dataclass
+class _Shard:
+    """Memory-mapped vectors and their documents for one shard (chat)"""
+    vectors: np.ndarray
+    scales: Optional[np.ndarray]
+    documents: List[Document]
+    ids: Dict[str, int]
+    docs_size: int
+    valid: np.ndarray
+    
+    def scores(self, query: np.ndarray, block_rows: int = 65536) -> np.ndarray:
+        """Cosine scores against the normalized query, dequantizing in blocks"""
+        if self.vectors.dtype == np.float32:
+            return self.vectors @ query
+        out = np.empty(len(self.vectors), dtype=np.float32)
+        for start in range(0, len(self.vectors), block_rows):
+            block = self.vectors[start:start + block_rows].astype(np.float32)
+            out[start:start + block_rows] = block @ query
+        if self.scales is not None:
+            out *= self.scales
+        return out
+
+class NumpyVectorStore(VectorStoreInterface):
+    """
+    In-process vector index backed by a memory-mapped matrix per shard.
+
+    Each shard (one per ``chat_id`` by default) lives in its own folder:
+
+    - ``header.json``: embedding dimension and storage dtype
+    - ``vectors.bin``: raw row-major, L2-normalized vectors (float32/float16/int8)
+    - ``scales.bin``: per-row float32 dequantization scales (int8 only)
+    - ``docs.jsonl``: one ``{"id", "text", "metadata"}`` line per row
+
+    Files are append-only and mapped with ``np.memmap`` so loading is zero-copy.
+    Row ``i`` of the vector files belongs to line ``i`` of ``docs.jsonl``; leftovers
+    of an interrupted append are cut off before the next append.
+    """
+    
+    def __init__(self, 
+                 root_directory: str, 
+                 embedding_model: str = "all-MiniLM-L6-v2",
+                 dtype: str = "float32",
+                 shard_key: str = "chat_id",
+                 embedding=None):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        self.root_directory = root_directory
+        self.dtype = dtype
+        self.shard_key = shard_key
+        self.embedding = embedding or get_embeddings(embedding_model)
+        self._shards: Dict[str, _Shard] = {}
+        self._lock = threading.RLock()
+        os.makedirs(root_directory, exist_ok=True)
+    
+    def _shard_dir(self, shard: str) -> str:
+        return os.path.join(self.root_directory, shard)
+    
+    @staticmethod
+    def _quantize(vectors: np.ndarray, dtype: str):
+        if dtype == "float32":
+            return vectors.astype(np.float32), None
+        if dtype == "float16":
+            return vectors.astype(np.float16), None
+        scales = np.max(np.abs(vectors), axis=1) / 127.0
+        scales = np.maximum(scales, 1e-12).astype(np.float32)
+        quantized = np.round(vectors / scales[:, None]).astype(np.int8)
+        return quantized, scales
+    
+    def _load_shard(self, shard: str) -> Optional[_Shard]:
+        directory = self._shard_dir(shard)
+        header_path = os.path.join(directory, "header.json")
+        docs_path = os.path.join(directory, "docs.jsonl")
+        if not os.path.exists(header_path) or not os.path.exists(docs_path):
+            return None
+        
+        # Reuse the mapping unless another store instance appended rows since
+        docs_size = os.path.getsize(docs_path)
+        cached = self._shards.get(shard)
+        if cached is not None and cached.docs_size == docs_size:
+            return cached
+        
+        with open(header_path, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        
+        documents, ids, valid = [], {}, []
+        with open(docs_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    # A torn final line from an interrupted write is not a row yet
+                    break
+                try:
+                    record = json.loads(line)
+                    document = Document(page_content=record["text"], metadata=record["metadata"])
+                except (ValueError, KeyError):
+                    # Keep the row position so later rows stay aligned with their vectors
+                    print(f"⚠️ Skipping unreadable row {len(documents)} in shard '{shard}'")
+                    documents.append(Document(page_content="", metadata={}))
+                    valid.append(False)
+                    continue
+                ids[record["id"]] = len(documents)
+                documents.append(document)
+                valid.append(True)
+        
+        dim, dtype = header["dim"], np.dtype(header["dtype"])
+        # Only rows with both a complete document line and a vector are visible
+        vector_rows = self._file_rows(os.path.join(directory, "vectors.bin"), dim * dtype.itemsize)
+        count = min(len(documents), vector_rows)
+        documents, valid = documents[:count], valid[:count]
+        ids = {doc_id: row for doc_id, row in ids.items() if row < count}
+        if count:
+            vectors = np.memmap(os.path.join(directory, "vectors.bin"), dtype=dtype, mode="r", shape=(count, dim))
+        else:
+            vectors = np.zeros((0, dim), dtype=dtype)
+        scales = None
+        if dtype == np.int8 and count:
+            scales = np.memmap(os.path.join(directory, "scales.bin"), dtype=np.float32, mode="r", shape=(count,))
+        
+        loaded = _Shard(
+            vectors=vectors, 
+            scales=scales, 
+            documents=documents, 
+            ids=ids, 
+            docs_size=docs_size, 
+            valid=np.array(valid, dtype=bool)
+        )
+        self._shards[shard] = loaded
+        return loaded
+    
+    @staticmethod
+    def _file_rows(path: str, row_bytes: int) -> int:
+        return os.path.getsize(path) // row_bytes if os.path.exists(path) else 0
+    
+    @staticmethod
+    def _line_end(path: str, lines: int) -> int:
+        """Byte offset just past the first ``lines`` newline-terminated lines"""
+        offset, seen = 0, 0
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                start = 0
+                while seen < lines:
+                    position = block.find(b"\n", start)
+                    if position < 0:
+                        break
+                    seen += 1
+                    start = position + 1
+                if seen == lines:
+                    return offset + start
+                offset += len(block)
+        return offset
+    
+    def _reconcile(self, shard: str, dim: int, dtype: str) -> None:
+        """
+        Undo the tail of an interrupted append: cut a partial last line from
+        ``docs.jsonl`` and truncate every file to the rows complete in all of them.
+        """
+        directory = self._shard_dir(shard)
+        docs_path = os.path.join(directory, "docs.jsonl")
+        files = {os.path.join(directory, "vectors.bin"): dim * np.dtype(dtype).itemsize}
+        if dtype == "int8":
+            files[os.path.join(directory, "scales.bin")] = np.dtype(np.float32).itemsize
+        
+        doc_rows = 0
+        if os.path.exists(docs_path):
+            with open(docs_path, "rb") as f:
+                doc_rows = sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+        rows = min([doc_rows] + [self._file_rows(path, row_bytes) for path, row_bytes in files.items()])
+        
+        if os.path.exists(docs_path):
+            end = self._line_end(docs_path, rows)
+            if os.path.getsize(docs_path) > end:
+                print(f"⚠️ Dropping an incomplete append from docs.jsonl in shard '{shard}'")
+                os.truncate(docs_path, end)
+        for path, row_bytes in files.items():
+            if os.path.exists(path) and os.path.getsize(path) > rows * row_bytes:
+                print(f"⚠️ Dropping orphaned rows from {os.path.basename(path)} in shard '{shard}'")
+                os.truncate(path, rows * row_bytes)
+    
+    def _append(self, shard: str, documents: List[Document], ids: List[str]) -> None:
+        vectors = _normalize(np.asarray(
+            self.embedding.embed_documents([doc.page_content for doc in documents]), dtype=np.float32
+        ))
+        directory = self._shard_dir(shard)
+        os.makedirs(directory, exist_ok=True)
+        header_path = os.path.join(directory, "header.json")
+        if os.path.exists(header_path):
+            # An existing shard keeps the dtype it was created with
+            with open(header_path, "r", encoding="utf-8") as f:
+                dtype = json.load(f)["dtype"]
+            if dtype != self.dtype:
+                print(f"⚠️ Shard '{shard}' is stored as {dtype}; appending as {dtype} instead of {self.dtype}")
+            self._reconcile(shard, int(vectors.shape[1]), dtype)
+        else:
+            dtype = self.dtype
+            with open(header_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": int(vectors.shape[1]), "dtype": dtype}, f)
+        stored, scales = self._quantize(vectors, dtype)
+        
+        # Vectors are written before documents so a visible row always has its vector;
+        # rows left over by a crash in between are cut by _reconcile on the next append
+        with open(os.path.join(directory, "vectors.bin"), "ab") as f:
+            f.write(np.ascontiguousarray(stored).tobytes())
+        if scales is not None:
+            with open(os.path.join(directory, "scales.bin"), "ab") as f:
+                f.write(scales.tobytes())
+        with open(os.path.join(directory, "docs.jsonl"), "a", encoding="utf-8") as f:
+            for doc_id, doc in zip(ids, documents):
+                f.write(json.dumps({"id": doc_id, "text": doc.page_content, "metadata": doc.metadata}) + "\n")
+        
+        # Drop the mapping so the next search sees the new rows
+        self._shards.pop(shard, None)
+    
+    def store_documents(self, documents: List[Document], ids: Optional[List[str]] = None) -> None:
+        """Embed and append documents to their shard, skipping IDs already stored"""
+        if not documents:
+            return
+        ids = ids or [f"{doc.metadata.get(self.shard_key, '_')}:{os.urandom(8).hex()}" for doc in documents]
+        
+        by_shard: Dict[str, List[int]] = {}
+        for i, doc in enumerate(documents):
+            by_shard.setdefault(str(doc.metadata.get(self.shard_key, "_default")), []).append(i)
+        
+        with self._lock:
+            for shard, positions in by_shard.items():
+                existing = self._load_shard(shard)
+                known = existing.ids if existing else {}
+                fresh = [i for i in positions if ids[i] not in known]
+                if fresh:
+                    self._append(shard, [documents[i] for i in fresh], [ids[i] for i in fresh])
+    
+    def search_similar(self, query: str, k: int = 4, filter_dict: Optional[Dict] = None) -> List[Document]:
+        """Vectorized cosine top-k within the shard selected by the filter"""
+        return [doc for doc, _ in self.search_similar_with_scores(query, k, filter_dict)]
+    
+    def search_similar_with_scores(self, 
+                                   query: str, 
+                                   k: int = 4, 
+                                   filter_dict: Optional[Dict] = None) -> List[Tuple[Document, float]]:
+        """Vectorized cosine top-k with cosine similarity scores"""
+        filter_dict = dict(filter_dict or {})
+        shard_name = str(filter_dict.pop(self.shard_key, "_default"))
+        with self._lock:
+            shard = self._load_shard(shard_name)
+        if shard is None or not shard.documents or k <= 0:
+            return []
+        
+        query_vector = _normalize(np.asarray(self.embedding.embed_query(query), dtype=np.float32))
+        scores = shard.scores(query_vector)
+        
+        mask = shard.valid
+        if filter_dict:
+            mask = mask & np.array([
+                all(doc.metadata.get(key) == value for key, value in filter_dict.items())
+                for doc in shard.documents
+            ])
+        if not mask.all():
+            scores = np.where(mask, scores, -np.inf)
+        
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(shard.documents[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
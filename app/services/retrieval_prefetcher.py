@@ -0,0 +1,148 @@
+# app/services/retrieval_prefetcher.py
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from langchain.schema.document import Document
+from services.vector_store_service import AdaptiveRetrievalConfig, VectorStoreService, get_embeddings
+
+@dataclass
+class PrefetchConfig:
+    """Configuration for speculative retrieval"""
+    similarity_threshold: float = 0.92
+    ttl_seconds: float = 120.0
+    max_wait_seconds: float = 2.0
+    max_workers: int = 2
+    min_question_chars: int = 8
+
+@dataclass
+class PrefetchedRetrieval:
+    """Retrieval done ahead of time for a typed question"""
+    retrieval_query: str
+    documents: List[Document]
+
+@dataclass
+class _PrefetchEntry:
+    question: str
+    retrieval_query: str
+    top_k: int
+    embedding: np.ndarray
+    documents: List[Document]
+    created_at: float
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+class RetrievalPrefetcher:
+    """
+    Warms retrieval results for a partially typed question in the background.
+
+    The latest prefetch per chat is cached; a submitted question reuses it when
+    it is textually identical or its embedding is close enough to the prefetched one.
+    Entries are keyed on the typed question, while retrieval runs on the query
+    produced by ``rewrite`` (e.g. a standalone follow-up), which is reused too.
+    """
+    
+    def __init__(self, 
+                 vector_store_service: VectorStoreService, 
+                 config: Optional[PrefetchConfig] = None,
+                 embedding=None,
+                 adaptive: Optional[AdaptiveRetrievalConfig] = None):
+        self.vector_store_service = vector_store_service
+        self.config = config or PrefetchConfig()
+        self.adaptive = adaptive
+        self.embedding = embedding or get_embeddings()
+        self._executor = ThreadPoolExecutor(max_workers=self.config.max_workers, thread_name_prefix="prefetch")
+        self._entries: Dict[str, _PrefetchEntry] = {}
+        self._pending: Dict[str, Future] = {}
+        # Bumped by invalidate() so prefetches started before new documents are discarded
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embedding.embed_query(text), dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+    
+    def _run(self, 
+             chat_id: str, 
+             question: str, 
+             top_k: int, 
+             generation: int, 
+             rewrite: Optional[Callable[[str], str]]) -> None:
+        embedding = self._embed(question)
+        retrieval_query = rewrite(question) if rewrite else question
+        documents = self.vector_store_service.get_query_chunks(
+            chat_id=chat_id, query=retrieval_query, top_k=top_k, adaptive=self.adaptive
+        )
+        with self._lock:
+            if self._generations.get(chat_id, 0) != generation:
+                return
+            self._entries[chat_id] = _PrefetchEntry(
+                question=question,
+                retrieval_query=retrieval_query,
+                top_k=top_k,
+                embedding=embedding,
+                documents=documents,
+                created_at=time.monotonic()
+            )
+    
+    def prefetch(self, 
+                 chat_id: str, 
+                 question: str, 
+                 top_k: int = 4, 
+                 rewrite: Optional[Callable[[str], str]] = None) -> None:
+        """Schedule speculative retrieval for a (possibly partial) question"""
+        if len(question.strip()) < self.config.min_question_chars:
+            return
+        with self._lock:
+            entry = self._entries.get(chat_id)
+            if entry and _normalize_text(entry.question) == _normalize_text(question) and entry.top_k == top_k:
+                return
+            pending = self._pending.get(chat_id)
+            if pending and not pending.done():
+                # Keep at most one in-flight prefetch per chat
+                return
+            generation = self._generations.get(chat_id, 0)
+            self._pending[chat_id] = self._executor.submit(
+                self._run, chat_id, question, top_k, generation, rewrite
+            )
+    
+    def _usable_entry(self, chat_id: str, top_k: int) -> Optional[_PrefetchEntry]:
+        with self._lock:
+            pending = self._pending.get(chat_id)
+        if pending is not None and not pending.done():
+            # Retrieval already in flight for this chat; a short wait is cheaper than redoing it
+            try:
+                pending.result(timeout=self.config.max_wait_seconds)
+            except TimeoutError:
+                return None
+            except Exception as e:
+                print(f"Prefetch failed for {chat_id}: {e}")
+        with self._lock:
+            entry = self._entries.get(chat_id)
+        if entry is None or entry.top_k != top_k:
+            return None
+        if time.monotonic() - entry.created_at > self.config.ttl_seconds:
+            return None
+        return entry
+    
+    def lookup(self, chat_id: str, question: str, top_k: int = 4) -> Optional[PrefetchedRetrieval]:
+        """Return the prefetched retrieval if the submitted question matches the typed one"""
+        entry = self._usable_entry(chat_id, top_k)
+        if entry is None:
+            return None
+        result = PrefetchedRetrieval(retrieval_query=entry.retrieval_query, documents=entry.documents)
+        if _normalize_text(entry.question) == _normalize_text(question):
+            return result
+        similarity = float(entry.embedding @ self._embed(question))
+        if similarity >= self.config.similarity_threshold:
+            return result
+        return None
+    
+    def invalidate(self, chat_id: str) -> None:
+        """Drop cached and in-flight results, e.g. after new documents were stored"""
+        with self._lock:
+            self._entries.pop(chat_id, None)
+            self._generations[chat_id] = self._generations.get(chat_id, 0) + 1
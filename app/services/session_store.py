@@ -0,0 +1,150 @@
+# app/services/session_store.py
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    chat_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id TEXT NOT NULL REFERENCES sessions(chat_id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_chat ON messages(chat_id, id);
+CREATE TABLE IF NOT EXISTS documents (
+    chat_id TEXT NOT NULL REFERENCES sessions(chat_id) ON DELETE CASCADE,
+    document_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    topics TEXT NOT NULL,
+    chunk_count INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (chat_id, document_id)
+);
+"""
+
+@dataclass
+class StoredDocument:
+    """An ingested document and its ingestion result, as persisted for a session"""
+    document_id: str
+    source: str
+    summary: str
+    topics: str
+    chunk_count: int
+
+@dataclass
+class StoredSession:
+    """Everything needed to restore a chat session without reprocessing"""
+    chat_id: str
+    messages: List[Dict[str, str]]
+    documents: List[StoredDocument]
+    
+    @property
+    def latest_document(self) -> Optional[StoredDocument]:
+        return self.documents[-1] if self.documents else None
+
+class SQLiteSessionStore:
+    """
+    Persists chat history and ingestion results keyed by ``chat_id``.
+
+    Vectors already live in the vector store under the same ``chat_id``, so
+    restoring a session only needs these rows to reattach to them.
+    """
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._transaction() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SCHEMA)
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            with self._conn:
+                yield self._conn
+    
+    def _touch(self, conn: sqlite3.Connection, chat_id: str) -> None:
+        now = time.time()
+        conn.execute(
+            "INSERT INTO sessions (chat_id, created_at, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(chat_id) DO UPDATE SET updated_at = excluded.updated_at",
+            (chat_id, now, now)
+        )
+    
+    def exists(self, chat_id: str) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT 1 FROM sessions WHERE chat_id = ?", (chat_id,)).fetchone()
+        return row is not None
+    
+    def append_message(self, chat_id: str, role: str, message: str) -> None:
+        with self._transaction() as conn:
+            self._touch(conn, chat_id)
+            conn.execute(
+                "INSERT INTO messages (chat_id, role, message, created_at) VALUES (?, ?, ?, ?)",
+                (chat_id, role, message, time.time())
+            )
+    
+    def clear_messages(self, chat_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM messages WHERE chat_id = ?", (chat_id,))
+    
+    def save_document(self, chat_id: str, document: StoredDocument) -> None:
+        with self._transaction() as conn:
+            self._touch(conn, chat_id)
+            conn.execute(
+                "INSERT OR REPLACE INTO documents "
+                "(chat_id, document_id, source, summary, topics, chunk_count, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (chat_id, document.document_id, document.source, document.summary,
+                 document.topics, document.chunk_count, time.time())
+            )
+    
+    def get_document(self, chat_id: str, document_id: str) -> Optional[StoredDocument]:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT document_id, source, summary, topics, chunk_count FROM documents "
+                "WHERE chat_id = ? AND document_id = ?",
+                (chat_id, document_id)
+            ).fetchone()
+        return StoredDocument(**dict(row)) if row else None
+    
+    def load(self, chat_id: str) -> Optional[StoredSession]:
+        """Load a session's messages and documents, or None if the ID is unknown"""
+        if not self.exists(chat_id):
+            return None
+        with self._transaction() as conn:
+            messages = conn.execute(
+                "SELECT role, message FROM messages WHERE chat_id = ? ORDER BY id", (chat_id,)
+            ).fetchall()
+            documents = conn.execute(
+                "SELECT document_id, source, summary, topics, chunk_count FROM documents "
+                "WHERE chat_id = ? ORDER BY created_at", (chat_id,)
+            ).fetchall()
+        return StoredSession(
+            chat_id=chat_id,
+            messages=[dict(row) for row in messages],
+            documents=[StoredDocument(**dict(row)) for row in documents]
+        )
+
+@lru_cache(maxsize=1)
+def get_session_store(db_path: str = "app/vectorstore/sessions.db") -> SQLiteSessionStore:
+    """Get the process-wide session store"""
+    return SQLiteSessionStore(db_path)
@@ -1,12 +1,16 @@
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import List, Union
-from llm.llm_client import get_llm
+from llm.llm_client import ModelCascade, get_llm_for_task
 from langchain.prompts import ChatPromptTemplate
 
 class TextProcessor(ABC):
     
+    # Task name used to pick the model in LLMFactory
+    task = "default"
+    
     def __init__(self):
-        self.llm = get_llm()
+        self.llm = get_llm_for_task(self.task)
     
     @abstractmethod
     def process(self, text: Union[str, List[str]]) -> str:
@@ -14,6 +18,8 @@ class TextProcessor(ABC):
 
 class TextSummarizer(TextProcessor):
     
+    task = "summarization"
+    
     def process(self, text: Union[str, List[str]]) -> str:
         # Handle both string and list inputs
         content = "\n\n".join(text) if isinstance(text, list) else text
@@ -34,6 +40,17 @@ class TextSummarizer(TextProcessor):
 
 class TopicExtractor(TextProcessor):
     
+    task = "topic_extraction"
+    
+    def __init__(self):
+        super().__init__()
+        self.cascade = ModelCascade(self.task)
+    
+    @staticmethod
+    def _is_confident(result: str) -> bool:
+        """A usable listing has at least a few non-empty lines"""
+        return sum(1 for line in result.splitlines() if line.strip()) >= 3
+    
     def process(self, text: Union[str, List[str]]) -> str:
         content = "\n\n".join(text) if isinstance(text, list) else text
         
@@ -46,7 +63,7 @@ class TopicExtractor(TextProcessor):
         TEXT:
         {text}
         """)
-        return self.llm.invoke(prompt.format(text=content))
+        return self.cascade.invoke(prompt.format(text=content), accept=self._is_confident)
 
 class TextProcessorService:
     """Service class that coordinates text processing operations"""
@@ -63,4 +80,9 @@ class TextProcessorService:
 
 # Factory function for backward compatibility
 def create_text_processor() -> TextProcessorService:
-    return TextProcessorService()
\ No newline at end of file
+    return TextProcessorService()
+
+@lru_cache(maxsize=1)
+def get_text_processor() -> TextProcessorService:
+    """Get a process-wide shared text processor service"""
+    return TextProcessorService()
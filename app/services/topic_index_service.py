@@ -0,0 +1,268 @@
+# app/services/topic_index_service.py
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from services.vector_store_service import get_embeddings, make_chunk_ids
+from utils.file_handler import compute_file_hash
+
+# Receives (file_path, chunks) and returns topic labels mapped to their weights
+LabelExtractor = Callable[[str, List[str]], Dict[str, float]]
+
+STUDY_INDEX = "study"
+EXAM_INDEX = "exam"
+
+def index_key(document_id: str, kind: str = STUDY_INDEX) -> str:
+    """Storage key for an index; exam indexes get their own namespace"""
+    return document_id if kind == STUDY_INDEX else f"{kind}-{document_id}"
+
+@dataclass
+class TopicEntry:
+    """A single topic with its embedding and the chunks that support it"""
+    label: str
+    embedding: np.ndarray
+    chunk_ids: List[str] = field(default_factory=list)
+    weight: float = 1.0
+
+@dataclass
+class DocumentTopicIndex:
+    """Precomputed topic index for one document"""
+    document_id: str
+    source: str
+    topics: List[TopicEntry]
+    kind: str = STUDY_INDEX
+    
+    @property
+    def key(self) -> str:
+        return index_key(self.document_id, self.kind)
+    
+    @property
+    def labels(self) -> List[str]:
+        return [topic.label for topic in self.topics]
+    
+    @property
+    def weights(self) -> Dict[str, float]:
+        return {topic.label: topic.weight for topic in self.topics}
+    
+    @property
+    def matrix(self) -> np.ndarray:
+        """Stacked, L2-normalized topic embeddings"""
+        if not self.topics:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([topic.embedding for topic in self.topics]).astype(np.float32)
+
+@dataclass
+class TopicCoverage:
+    """How well study materials cover one exam topic"""
+    topic: str
+    status: str
+    score: float
+    matched_topic: Optional[str] = None
+    matched_source: Optional[str] = None
+    chunk_ids: List[str] = field(default_factory=list)
+    
+    def describe(self) -> str:
+        if self.matched_topic is None:
+            return f"{self.status} (no related topic found in study materials)"
+        return (f"{self.status} (closest: '{self.matched_topic}' in {self.matched_source}, "
+                f"similarity {self.score:.2f})")
+
+def parse_topic_labels(text: str, max_labels: int = 30) -> List[str]:
+    """Parse an LLM topic listing (bullets, numbered lines or commas) into labels"""
+    labels: List[str] = []
+    seen = set()
+    for line in text.splitlines():
+        line = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip()
+        # Skip section headings such as "Main Topics:"
+        if not line or line.endswith(":"):
+            continue
+        if ":" in line:
+            line = line.split(":", 1)[1]
+        for part in line.split(","):
+            label = part.strip().strip("*").strip()
+            key = label.lower()
+            if label and len(label) <= 80 and key not in seen:
+                seen.add(key)
+                labels.append(label)
+    return labels[:max_labels]
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+class TopicIndexStore(ABC):
+    """Persistence for per-document topic indexes"""
+    
+    @abstractmethod
+    def load(self, key: str) -> Optional[DocumentTopicIndex]:
+        pass
+    
+    @abstractmethod
+    def save(self, index: DocumentTopicIndex) -> None:
+        pass
+
+class FileTopicIndexStore(TopicIndexStore):
+    """Stores each index as ``<key>.npz`` (embeddings) plus ``.json`` (labels, chunk IDs)"""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key)
+        return f"{base}.npz", f"{base}.json"
+    
+    def load(self, key: str) -> Optional[DocumentTopicIndex]:
+        npz_path, json_path = self._paths(key)
+        if not (os.path.exists(npz_path) and os.path.exists(json_path)):
+            return None
+        with open(json_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        embeddings = np.load(npz_path)["embeddings"]
+        topics = [
+            TopicEntry(
+                label=entry["label"], 
+                embedding=embeddings[i], 
+                chunk_ids=entry["chunk_ids"], 
+                weight=entry.get("weight", 1.0)
+            )
+            for i, entry in enumerate(meta["topics"])
+        ]
+        return DocumentTopicIndex(
+            document_id=meta.get("document_id", key),
+            source=meta.get("source", ""),
+            topics=topics,
+            kind=meta.get("kind", STUDY_INDEX)
+        )
+    
+    def save(self, index: DocumentTopicIndex) -> None:
+        npz_path, json_path = self._paths(index.key)
+        np.savez(npz_path, embeddings=index.matrix)
+        meta = {
+            "document_id": index.document_id,
+            "kind": index.kind,
+            "source": index.source,
+            "topics": [{"label": t.label, "chunk_ids": t.chunk_ids, "weight": t.weight} for t in index.topics]
+        }
+        # Write JSON last so a partially written index is never loaded
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+@dataclass
+class CoverageThresholds:
+    """Cosine similarity cut-offs for coverage status"""
+    well_covered: float = 0.6
+    partially_covered: float = 0.4
+
+class TopicIndexService:
+    """Builds, caches and matches per-document topic indexes"""
+    
+    def __init__(self,
+                 store: TopicIndexStore,
+                 embedding_model: str = "all-MiniLM-L6-v2",
+                 supporting_chunks: int = 3,
+                 thresholds: Optional[CoverageThresholds] = None):
+        self.store = store
+        self.embedding = get_embeddings(embedding_model)
+        self.supporting_chunks = supporting_chunks
+        self.thresholds = thresholds or CoverageThresholds()
+        self._cache: Dict[str, DocumentTopicIndex] = {}
+    
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        return _normalize(np.asarray(self.embedding.embed_documents(texts), dtype=np.float32))
+    
+    def build_index(self, 
+                    document_id: str, 
+                    source: str, 
+                    chunks: List[str], 
+                    labels: List[str],
+                    weights: Optional[Dict[str, float]] = None,
+                    kind: str = STUDY_INDEX) -> DocumentTopicIndex:
+        """Embed topic labels, attach their best supporting chunks and persist the index"""
+        weights = weights or {}
+        topics: List[TopicEntry] = []
+        if labels and chunks:
+            label_vectors = self._embed(labels)
+            chunk_vectors = self._embed(chunks)
+            chunk_ids = make_chunk_ids(document_id, len(chunks))
+            scores = label_vectors @ chunk_vectors.T
+            k = min(self.supporting_chunks, len(chunks))
+            for i, label in enumerate(labels):
+                best = np.argsort(-scores[i])[:k]
+                topics.append(TopicEntry(
+                    label=label,
+                    embedding=label_vectors[i],
+                    chunk_ids=[chunk_ids[j] for j in best],
+                    weight=weights.get(label, 1.0)
+                ))
+        
+        index = DocumentTopicIndex(document_id=document_id, source=source, topics=topics, kind=kind)
+        self.store.save(index)
+        self._cache[index.key] = index
+        return index
+    
+    def get_index(self, document_id: str, kind: str = STUDY_INDEX) -> Optional[DocumentTopicIndex]:
+        """Return a previously built index of the given kind, if any"""
+        key = index_key(document_id, kind)
+        if key not in self._cache:
+            index = self.store.load(key)
+            if index is None or index.kind != kind:
+                return None
+            self._cache[key] = index
+        return self._cache[key]
+    
+    def get_or_build_for_file(self,
+                              file_path: str,
+                              chunker: Callable[[str], List[str]],
+                              label_extractor: LabelExtractor,
+                              kind: str = STUDY_INDEX) -> DocumentTopicIndex:
+        """Load the index for a file by content hash and kind, building it only on first sight"""
+        document_id = compute_file_hash(file_path)
+        index = self.get_index(document_id, kind)
+        if index is not None:
+            return index
+        chunks = chunker(file_path)
+        weights = label_extractor(file_path, chunks)
+        return self.build_index(document_id, os.path.basename(file_path), chunks, list(weights), weights, kind=kind)
+    
+    def _status(self, score: float) -> str:
+        if score >= self.thresholds.well_covered:
+            return "Well Covered"
+        if score >= self.thresholds.partially_covered:
+            return "Partially Covered"
+        return "Not Covered"
+    
+    def match_coverage(self,
+                       exam_index: DocumentTopicIndex,
+                       study_indexes: List[DocumentTopicIndex]) -> List[TopicCoverage]:
+        """Match exam topics to study-material topics by cosine similarity"""
+        candidates = [(index, topic) for index in study_indexes for topic in index.topics]
+        if not exam_index.topics:
+            return []
+        if not candidates:
+            return [TopicCoverage(topic=label, status="Not Covered", score=0.0) for label in exam_index.labels]
+        
+        study_matrix = np.vstack([topic.embedding for _, topic in candidates])
+        scores = exam_index.matrix @ study_matrix.T
+        best = scores.argmax(axis=1)
+        
+        coverage = []
+        for i, label in enumerate(exam_index.labels):
+            index, topic = candidates[best[i]]
+            score = float(scores[i, best[i]])
+            coverage.append(TopicCoverage(
+                topic=label,
+                status=self._status(score),
+                score=score,
+                matched_topic=topic.label,
+                matched_source=index.source,
+                chunk_ids=topic.chunk_ids
+            ))
+        return coverage
+
+def create_topic_index_service(directory: str = "app/vectorstore/topic_index") -> TopicIndexService:
+    """Create a topic index service persisted on the local filesystem"""
+    return TopicIndexService(FileTopicIndexStore(directory))
@@ -1,46 +1,113 @@
 # app/services/vector_store_service.py
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
-from langchain_community.vectorstores import Chroma
+from dataclasses import dataclass, replace
+from functools import lru_cache
+import os
+from typing import List, Dict, Optional, Tuple
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.schema.document import Document
 
+@lru_cache(maxsize=4)
+def get_embeddings(model_name: str = "all-MiniLM-L6-v2") -> HuggingFaceEmbeddings:
+    """Get a cached embedding model shared by the vector store and topic index"""
+    # Unit vectors make every backend's distance convertible to cosine similarity
+    return HuggingFaceEmbeddings(model_name=model_name, encode_kwargs={"normalize_embeddings": True})
+
+def make_chunk_ids(document_id: str, count: int) -> List[str]:
+    """Build stable chunk IDs for a document's chunks"""
+    return [f"{document_id}:{i}" for i in range(count)]
+
 class VectorStoreInterface(ABC):
     """Interface for vector store operations (Interface Segregation)"""
     
     @abstractmethod
-    def store_documents(self, documents: List[Document]) -> None:
+    def store_documents(self, documents: List[Document], ids: Optional[List[str]] = None) -> None:
         pass
     
     @abstractmethod
     def search_similar(self, query: str, k: int = 4, filter_dict: Optional[Dict] = None) -> List[Document]:
         pass
+    
+    @abstractmethod
+    def search_similar_with_scores(self, 
+                                   query: str, 
+                                   k: int = 4, 
+                                   filter_dict: Optional[Dict] = None) -> List[Tuple[Document, float]]:
+        """Like search_similar, with the cosine similarity of each document to the query"""
+        pass
 
 class ChromaVectorStore(VectorStoreInterface):
     """Concrete implementation using ChromaDB"""
     
     def __init__(self, persist_directory: str, embedding_model: str = "all-MiniLM-L6-v2"):
         self.persist_directory = persist_directory
-        self.embedding = HuggingFaceEmbeddings(model_name=embedding_model)
+        self.embedding = get_embeddings(embedding_model)
         self._db = None
     
     @property
     def db(self):
         """Lazy initialization of ChromaDB"""
         if self._db is None:
+            # Imported lazily so other backends do not require Chroma/SQLite
+            from langchain_community.vectorstores import Chroma
             self._db = Chroma(
                 persist_directory=self.persist_directory,
                 embedding_function=self.embedding
             )
         return self._db
     
-    def store_documents(self, documents: List[Document]) -> None:
+    def store_documents(self, documents: List[Document], ids: Optional[List[str]] = None) -> None:
         """Store documents in the vector store"""
-        self.db.add_documents(documents)
+        self.db.add_documents(documents, ids=ids)
     
     def search_similar(self, query: str, k: int = 4, filter_dict: Optional[Dict] = None) -> List[Document]:
         """Search for similar documents"""
-        return self.db.similarity_search(query, k=k, filter=filter_dict)
+        return self.db.similarity_search(query, k=k, filter=self._where(filter_dict))
+    
+    def _distance_to_cosine(self, distance: float) -> float:
+        """Convert a Chroma distance to cosine similarity (embeddings are unit-normalized)"""
+        space = (self.db._collection.metadata or {}).get("hnsw:space", "l2")
+        if space == "l2":
+            # Chroma reports squared L2, and |a - b|^2 = 2 - 2cos for unit vectors
+            return 1.0 - distance / 2.0
+        return 1.0 - distance
+    
+    @staticmethod
+    def _where(filter_dict: Optional[Dict]) -> Optional[Dict]:
+        """Chroma only accepts one field per filter; combine several with $and"""
+        if not filter_dict or len(filter_dict) == 1:
+            return filter_dict
+        return {"$and": [{key: value} for key, value in filter_dict.items()]}
+    
+    def search_similar_with_scores(self, 
+                                   query: str, 
+                                   k: int = 4, 
+                                   filter_dict: Optional[Dict] = None) -> List[Tuple[Document, float]]:
+        """Search for similar documents with cosine similarity scores"""
+        results = self.db.similarity_search_with_score(query, k=k, filter=self._where(filter_dict))
+        return [(doc, self._distance_to_cosine(distance)) for doc, distance in results]
+
+@dataclass
+class AdaptiveRetrievalConfig:
+    """
+    Picks k per query from the cosine score distribution: candidates below ``min_score``
+    are dropped (returning nothing if even the best is below it), and the list is
+    cut at the first drop of at least ``gap_threshold`` between consecutive scores.
+    """
+    min_k: int = 1
+    max_k: int = 8
+    min_score: float = 0.25
+    gap_threshold: float = 0.1
+
+def select_adaptive_k(scores: List[float], config: AdaptiveRetrievalConfig) -> int:
+    """Return how many of the descending ``scores`` to keep"""
+    if not scores or scores[0] < config.min_score:
+        return 0
+    k = sum(1 for score in scores[:config.max_k] if score >= config.min_score)
+    for i in range(max(config.min_k, 1), k):
+        if scores[i - 1] - scores[i] >= config.gap_threshold:
+            return i
+    return max(k, min(config.min_k, len(scores)))
 
 class VectorStoreService:
     """Service class that handles vector store operations with dependency injection"""
@@ -48,27 +115,90 @@ class VectorStoreService:
     def __init__(self, vector_store: VectorStoreInterface):
         self.vector_store = vector_store
     
-    def store_chunks(self, chat_id: str, chunks: List[str], metadata: Optional[Dict] = None) -> None:
+    def store_chunks(self, 
+                     chat_id: str, 
+                     chunks: List[str], 
+                     metadata: Optional[Dict] = None,
+                     chunk_ids: Optional[List[str]] = None) -> None:
         """Store text chunks as documents"""
         documents = [
             Document(
                 page_content=chunk,
-                metadata={"chat_id": chat_id, **(metadata or {})}
+                metadata={
+                    "chat_id": chat_id,
+                    **(metadata or {}),
+                    **({"chunk_id": chunk_ids[i]} if chunk_ids else {})
+                }
             )
-            for chunk in chunks
+            for i, chunk in enumerate(chunks)
         ]
-        self.vector_store.store_documents(documents)
+        ids = [f"{chat_id}:{chunk_id}" for chunk_id in chunk_ids] if chunk_ids else None
+        self.vector_store.store_documents(documents, ids=ids)
+    
+    @staticmethod
+    def _filter(chat_id: str, document_id: Optional[str]) -> Dict:
+        return {"chat_id": chat_id, **({"document_id": document_id} if document_id else {})}
     
-    def get_query_chunks(self, chat_id: str, query: str, top_k: int = 4) -> List[Document]:
-        """Search for relevant chunks filtered by chat_id"""
-        return self.vector_store.search_similar(
+    def get_query_chunks(self, 
+                         chat_id: str, 
+                         query: str, 
+                         top_k: int = 4,
+                         adaptive: Optional[AdaptiveRetrievalConfig] = None,
+                         document_id: Optional[str] = None) -> List[Document]:
+        """Search for relevant chunks filtered by chat_id (and optionally one document)"""
+        if adaptive is None:
+            return self.vector_store.search_similar(
+                query=query,
+                k=top_k,
+                filter_dict=self._filter(chat_id, document_id)
+            )
+        return [doc for doc, _ in self.get_query_chunks_with_scores(chat_id, query, top_k, adaptive, document_id)]
+    
+    def get_query_chunks_with_scores(self, 
+                                     chat_id: str, 
+                                     query: str, 
+                                     top_k: int = 4,
+                                     adaptive: Optional[AdaptiveRetrievalConfig] = None,
+                                     document_id: Optional[str] = None) -> List[Tuple[Document, float]]:
+        """
+        Search for relevant chunks with scores. In adaptive mode at most
+        ``min(top_k, adaptive.max_k)`` candidates are fetched, then trimmed by score.
+        """
+        if adaptive is not None:
+            # Adaptive k only ever shrinks the prompt relative to the fixed top_k
+            max_k = min(top_k, adaptive.max_k)
+            adaptive = replace(adaptive, max_k=max_k, min_k=min(adaptive.min_k, max_k))
+        k = adaptive.max_k if adaptive else top_k
+        results = self.vector_store.search_similar_with_scores(
             query=query,
-            k=top_k,
-            filter_dict={"chat_id": chat_id}
+            k=k,
+            filter_dict=self._filter(chat_id, document_id)
         )
+        if adaptive is None:
+            return results
+        
+        chosen_k = select_adaptive_k([score for _, score in results], adaptive)
+        best = f"{results[0][1]:.3f}" if results else "n/a"
+        print(f"🔎 Adaptive retrieval for {chat_id}: k={chosen_k} of {len(results)} (best score {best})")
+        return results[:chosen_k]
 
 # Factory function for creating the service
-def create_vector_store_service(persist_directory: str = "app/vectorstore/chromadb") -> VectorStoreService:
-    """Create a vector store service with ChromaDB backend"""
-    chroma_store = ChromaVectorStore(persist_directory)
-    return VectorStoreService(chroma_store)
+def create_vector_store_service(persist_directory: Optional[str] = None, 
+                                backend: Optional[str] = None,
+                                dtype: Optional[str] = None) -> VectorStoreService:
+    """
+    Create a vector store service.
+
+    ``backend`` is "chroma" (default) or "numpy", falling back to the
+    EDUAGENT_VECTOR_BACKEND environment variable. ``dtype`` selects the
+    numpy backend's storage precision (float32, float16 or int8), falling
+    back to EDUAGENT_VECTOR_DTYPE.
+    """
+    backend = backend or os.environ.get("EDUAGENT_VECTOR_BACKEND", "chroma")
+    if backend == "chroma":
+        return VectorStoreService(ChromaVectorStore(persist_directory or "app/vectorstore/chromadb"))
+    if backend == "numpy":
+        from services.numpy_vector_store import NumpyVectorStore
+        dtype = dtype or os.environ.get("EDUAGENT_VECTOR_DTYPE", "float32")
+        return VectorStoreService(NumpyVectorStore(persist_directory or "app/vectorstore/numpy", dtype=dtype))
+    raise ValueError(f"Unknown vector store backend: {backend}")
@@ -0,0 +1,181 @@
+# app/services/work_scheduler.py
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+# Rough token charges used for quota accounting before the work runs
+QUESTION_TOKEN_ESTIMATE = 2000
+TOKENS_PER_PAGE = 600
+
+class WorkType(Enum):
+    """Kinds of work, in priority order (lower value runs first)"""
+    INTERACTIVE = 0
+    BULK = 1
+
+class QuotaExceededError(RuntimeError):
+    """Raised when a session submits work beyond its token quota"""
+
+@dataclass
+class SchedulerConfig:
+    """Limits for the shared work scheduler"""
+    max_workers: int = int(os.environ.get("EDUAGENT_SCHEDULER_WORKERS", "4"))
+    per_session_concurrency: int = 2
+    session_token_quota: int = int(os.environ.get("EDUAGENT_SESSION_TOKEN_QUOTA", "200000"))
+    quota_window_seconds: float = 3600.0
+    # Bulk work waiting longer than this is treated as interactive so it cannot starve
+    bulk_aging_seconds: float = 120.0
+    wait_samples: int = 500
+
+@dataclass
+class _Job:
+    chat_id: str
+    work_type: WorkType
+    fn: Callable[[], Any]
+    future: Future
+    seq: int
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+class WorkScheduler:
+    """
+    Runs work tagged by ``chat_id`` and WorkType on a fixed worker pool.
+
+    Interactive Q&A is picked before bulk ingestion, each session may only run
+    ``per_session_concurrency`` jobs at once, and declared token usage is
+    charged against a per-session quota over a sliding window.
+    """
+    
+    def __init__(self, config: Optional[SchedulerConfig] = None):
+        self.config = config or SchedulerConfig()
+        self._queue: List[_Job] = []
+        self._running: Dict[str, int] = {}
+        self._usage: Dict[str, Deque[Tuple[float, int]]] = {}
+        self._waits: Dict[WorkType, Deque[float]] = {
+            work_type: deque(maxlen=self.config.wait_samples) for work_type in WorkType
+        }
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"scheduler-{i}", daemon=True)
+            for i in range(self.config.max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+    
+    def _tokens_used(self, chat_id: str, now: float) -> int:
+        usage = self._usage.setdefault(chat_id, deque())
+        while usage and now - usage[0][0] > self.config.quota_window_seconds:
+            usage.popleft()
+        return sum(tokens for _, tokens in usage)
+    
+    def submit(self, 
+               chat_id: str, 
+               work_type: WorkType, 
+               fn: Callable[..., Any], 
+               /,
+               *args, 
+               tokens: int = 0, 
+               **kwargs) -> Future:
+        """Queue work for a session; raises QuotaExceededError if the quota would be exceeded"""
+        future: Future = Future()
+        with self._cond:
+            now = time.monotonic()
+            used = self._tokens_used(chat_id, now)
+            if tokens and used + tokens > self.config.session_token_quota:
+                raise QuotaExceededError(
+                    f"Session token quota reached ({used}/{self.config.session_token_quota} tokens "
+                    f"in the last {self.config.quota_window_seconds / 60:.0f} min); please try again later."
+                )
+            if tokens:
+                self._usage[chat_id].append((now, tokens))
+            self._queue.append(_Job(
+                chat_id=chat_id,
+                work_type=work_type,
+                fn=lambda: fn(*args, **kwargs),
+                future=future,
+                seq=next(self._seq)
+            ))
+            self._cond.notify()
+        return future
+    
+    def run(self, chat_id: str, work_type: WorkType, fn: Callable[..., Any], /, *args, tokens: int = 0, **kwargs) -> Any:
+        """Submit work and block until its result is available"""
+        return self.submit(chat_id, work_type, fn, *args, tokens=tokens, **kwargs).result()
+    
+    def _priority(self, job: _Job, now: float) -> Tuple[int, int]:
+        priority = job.work_type.value
+        if job.work_type is WorkType.BULK and now - job.enqueued_at > self.config.bulk_aging_seconds:
+            priority = WorkType.INTERACTIVE.value
+        return priority, job.seq
+    
+    def _next_job(self) -> Optional[_Job]:
+        """Highest-priority queued job whose session is under its concurrency limit"""
+        now = time.monotonic()
+        eligible = [
+            job for job in self._queue
+            if self._running.get(job.chat_id, 0) < self.config.per_session_concurrency
+        ]
+        if not eligible:
+            return None
+        job = min(eligible, key=lambda j: self._priority(j, now))
+        self._queue.remove(job)
+        return job
+    
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+                self._running[job.chat_id] = self._running.get(job.chat_id, 0) + 1
+                self._waits[job.work_type].append(time.monotonic() - job.enqueued_at)
+            
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_result(job.fn())
+            except BaseException as e:
+                job.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._running[job.chat_id] -= 1
+                    if not self._running[job.chat_id]:
+                        del self._running[job.chat_id]
+                    # A finished job may unblock queued work from the same session
+                    self._cond.notify_all()
+    
+    def queue_depth(self, work_type: Optional[WorkType] = None) -> int:
+        with self._cond:
+            return sum(1 for job in self._queue if work_type is None or job.work_type is work_type)
+    
+    def wait_stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue wait times (seconds) per work type over recent jobs"""
+        with self._cond:
+            stats = {}
+            for work_type, samples in self._waits.items():
+                ordered = sorted(samples)
+                count = len(ordered)
+                stats[work_type.name.lower()] = {
+                    "queued": sum(1 for job in self._queue if job.work_type is work_type),
+                    "samples": count,
+                    "p50": ordered[count // 2] if count else 0.0,
+                    "p95": ordered[min(count - 1, int(count * 0.95))] if count else 0.0,
+                    "max": ordered[-1] if count else 0.0,
+                }
+            return stats
+    
+    def session_usage(self, chat_id: str) -> int:
+        """Tokens charged to a session within the current quota window"""
+        with self._cond:
+            return self._tokens_used(chat_id, time.monotonic())
+
+@lru_cache(maxsize=1)
+def get_work_scheduler() -> WorkScheduler:
+    """Get the process-wide scheduler shared by all sessions"""
+    return WorkScheduler()
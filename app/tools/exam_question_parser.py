@@ -0,0 +1,133 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import fitz
+
+QUESTION_START = re.compile(
+    r"^\s*(?:(?:Q(?:uestion)?\.?\s*)(\d{1,3})\b[.:)]?|(\d{1,3})\s*[.)])\s*(.*)$",
+    re.IGNORECASE
+)
+MARKS = re.compile(
+    r"[\[(]\s*(\d+(?:\.\d+)?)\s*(?:marks?|mks?|pts?|points?)\s*[\])]"
+    r"|\b(\d+(?:\.\d+)?)\s*(?:marks|points)\b",
+    re.IGNORECASE
+)
+TOTAL_BEFORE = re.compile(r"\btotal\b[^\d\[\]()]*[\[(]?\s*$", re.IGNORECASE)
+TOTAL_AFTER = re.compile(r"\s*(?:in\s+)?total\b(?!\s*[:=]?\s*[\[(]?\s*\d)", re.IGNORECASE)
+SUBPART = re.compile(r"(?:^|(?<=[\s\])]))\(?(?:[a-h]|i{1,3}|iv|vi{0,3}|ix|x)\)", re.MULTILINE)
+
+@dataclass
+class ExamQuestion:
+    """A single top-level exam question"""
+    number: str
+    text: str
+    marks: Optional[float] = None
+    page: int = 0
+
+@dataclass
+class _Line:
+    text: str
+    x0: float = 0.0
+    page: int = 0
+
+def _is_labelled_total(text: str, match: re.Match) -> bool:
+    before = text[max(0, match.start() - 20):match.start()]
+    after = text[match.end():match.end() + 20]
+    return bool(TOTAL_BEFORE.search(before) or TOTAL_AFTER.match(after))
+
+def detect_marks(text: str) -> Optional[float]:
+    """
+    Detect the marks allotted to a question. When sub-parts carry their own marks
+    and the question also states a total, the total is used instead of the sum.
+    A total is either labelled ("Total: 10 marks") or the single value stated in
+    the question stem, before the first sub-part marker such as "(a)" or "(i)".
+    """
+    matches = list(MARKS.finditer(text))
+    if not matches:
+        return None
+    values = [float(m.group(1) or m.group(2)) for m in matches]
+    for match, value in zip(matches, values):
+        if _is_labelled_total(text, match):
+            return value
+    first_part = SUBPART.search(text)
+    if first_part:
+        stem = [value for match, value in zip(matches, values) if match.start() < first_part.start()]
+        if len(stem) == 1 and len(values) > 1:
+            return stem[0]
+    return sum(values)
+
+class ExamQuestionParser:
+    """Splits exam papers into top-level questions using numbering and layout"""
+    
+    def __init__(self, margin_tolerance: float = 25.0, max_number: int = 200):
+        self.margin_tolerance = margin_tolerance
+        self.max_number = max_number
+    
+    def parse_text(self, text: str) -> List[ExamQuestion]:
+        """Parse plain text where each question starts on its own numbered line"""
+        return self._parse_lines([_Line(line) for line in text.splitlines()])
+    
+    def parse_pdf(self, file_path: str) -> List[ExamQuestion]:
+        """Parse a PDF, only accepting numbering that starts at the page's left margin"""
+        lines: List[_Line] = []
+        with fitz.open(file_path, filetype="pdf") as doc:
+            for page_number, page in enumerate(doc):
+                blocks = [b for b in page.get_text("blocks") if b[6] == 0]
+                blocks.sort(key=lambda b: (round(b[1], 1), b[0]))
+                for x0, _, _, _, text, _, _ in blocks:
+                    for line in text.splitlines():
+                        lines.append(_Line(line, x0, page_number))
+        return self._parse_lines(lines)
+    
+    def _left_margins(self, lines: List[_Line]) -> dict:
+        margins = {}
+        for line in lines:
+            if line.text.strip():
+                margins[line.page] = min(margins.get(line.page, line.x0), line.x0)
+        return margins
+    
+    def _start_of(self, line: _Line, margins: dict, expected: int) -> Optional[Tuple[str, str]]:
+        match = QUESTION_START.match(line.text)
+        if not match:
+            return None
+        number = match.group(1) or match.group(2)
+        # Indented numbers are sub-parts or list items, not new questions
+        if line.x0 - margins.get(line.page, 0.0) > self.margin_tolerance:
+            return None
+        # Numbering must move forward, which rejects years, figures and stray counts
+        if not expected <= int(number) <= min(expected + 2, self.max_number):
+            return None
+        return number, match.group(3)
+    
+    def _parse_lines(self, lines: List[_Line]) -> List[ExamQuestion]:
+        margins = self._left_margins(lines)
+        questions: List[ExamQuestion] = []
+        current: Optional[ExamQuestion] = None
+        body: List[str] = []
+        preamble: List[str] = []
+        expected = 1
+        
+        def close():
+            if current is not None:
+                current.text = "\n".join(body).strip()
+                current.marks = detect_marks(current.text)
+                questions.append(current)
+        
+        for line in lines:
+            start = self._start_of(line, margins, expected)
+            if start:
+                close()
+                number, rest = start
+                current = ExamQuestion(number=number, text="", page=line.page)
+                body = [rest] if rest else []
+                expected = int(number) + 1
+            elif current is not None:
+                body.append(line.text)
+            else:
+                preamble.append(line.text)
+        close()
+        
+        if not questions:
+            text = "\n".join(preamble).strip()
+            return [ExamQuestion(number="1", text=text, marks=detect_marks(text))] if text else []
+        return questions
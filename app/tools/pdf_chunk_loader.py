@@ -4,6 +4,7 @@ import fitz
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.tools import Tool
 from dataclasses import dataclass
+from tools.pdf_ocr import OCRConfig, PageOCRService, page_fingerprint
 
 @dataclass
 class ChunkingConfig:
@@ -20,14 +21,33 @@ class DocumentProcessor(ABC):
         pass
 
 class PDFProcessor(DocumentProcessor):
-    """Concrete implementation for PDF processing"""
+    """
+    Concrete implementation for PDF processing.
+
+    Native text extraction is the fast path; pages with almost no text (scans)
+    are sent to OCR lazily when an OCR service is configured.
+    """
+    
+    def __init__(self, ocr_service: Optional[PageOCRService] = None):
+        self.ocr_service = ocr_service
     
     def extract_text(self, file_path: str) -> str:
-        """Extract text from PDF file"""
-        with open(file_path, "rb") as f:
-            doc = fitz.open(stream=f.read(), filetype="pdf")
-            full_text = "\n\n".join([page.get_text() for page in doc])
-        return full_text
+        """Extract text from PDF file, opened by path so pages are read lazily"""
+        with fitz.open(file_path, filetype="pdf") as doc:
+            pages = [page.get_text() for page in doc]
+            
+            if self.ocr_service:
+                low_text = {
+                    i: page_fingerprint(doc, doc[i])
+                    for i, text in enumerate(pages)
+                    if self.ocr_service.needs_ocr(text)
+                }
+                if low_text:
+                    for i, text in self.ocr_service.ocr_pages(file_path, low_text).items():
+                        if len(text.strip()) > len(pages[i].strip()):
+                            pages[i] = text
+        
+        return "\n\n".join(pages)
 
 class TextChunker:
     """Handles text chunking with configurable parameters"""
@@ -60,12 +80,18 @@ class DocumentChunkingService:
 def create_pdf_chunking_service(config: Optional[ChunkingConfig] = None) -> DocumentChunkingService:
     """Create a PDF chunking service with default configuration"""
     chunking_config = config or ChunkingConfig()
-    processor = PDFProcessor()
+    ocr_config = OCRConfig()
+    processor = PDFProcessor(PageOCRService(ocr_config) if ocr_config.enabled else None)
     chunker = TextChunker(chunking_config)
     return DocumentChunkingService(processor, chunker)
 
 
 
+def count_pdf_pages(path: str) -> int:
+    """Return the number of pages in a PDF without extracting text"""
+    with fitz.open(path, filetype="pdf") as doc:
+        return doc.page_count
+
 def extract_and_chunk_pdf(path: str, chunk_size=800, chunk_overlap=100) -> List[str]:
     """Legacy function for backward compatibility"""
     config = ChunkingConfig(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
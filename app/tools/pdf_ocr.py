@@ -0,0 +1,106 @@
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+import fitz
+
+@dataclass(frozen=True)
+class OCRConfig:
+    """Configuration for the lazy OCR fallback on low-text pages"""
+    enabled: bool = os.environ.get("EDUAGENT_OCR", "1") == "1"
+    min_chars_per_page: int = 40
+    language: str = "eng"
+    dpi: int = 300
+    max_workers: int = max(1, (os.cpu_count() or 2) - 1)
+    cache_dir: str = "app/vectorstore/ocr_cache"
+
+def page_fingerprint(doc: "fitz.Document", page: "fitz.Page") -> str:
+    """Hash a page's content stream and embedded images, so identical scans share a key"""
+    digest = hashlib.sha256()
+    digest.update(page.read_contents() or b"")
+    for image in page.get_images(full=True):
+        digest.update(doc.xref_stream_raw(image[0]) or b"")
+    digest.update(repr(tuple(page.rect)).encode())
+    return digest.hexdigest()
+
+def _ocr_page(file_path: str, page_number: int, language: str, dpi: int) -> str:
+    """Worker entry point: OCR one page with Tesseract through PyMuPDF"""
+    with fitz.open(file_path, filetype="pdf") as doc:
+        page = doc[page_number]
+        textpage = page.get_textpage_ocr(language=language, dpi=dpi, full=True)
+        return page.get_text(textpage=textpage)
+
+class OCRCache:
+    """Stores OCR output on disk keyed by page fingerprint"""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt")
+    
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    
+    def put(self, key: str, text: str) -> None:
+        tmp_path = f"{self._path(key)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, self._path(key))
+
+@lru_cache(maxsize=1)
+def _get_ocr_pool(max_workers: int) -> Executor:
+    # Spawned workers avoid forking a multi-threaded Streamlit process
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+class PageOCRService:
+    """OCRs selected pages of a PDF in a worker pool, reusing cached results"""
+    
+    def __init__(self, config: Optional[OCRConfig] = None):
+        self.config = config or OCRConfig()
+        self.cache = OCRCache(self.config.cache_dir)
+    
+    def needs_ocr(self, native_text: str) -> bool:
+        return len(native_text.strip()) < self.config.min_chars_per_page
+    
+    def ocr_pages(self, file_path: str, fingerprints: Dict[int, str]) -> Dict[int, str]:
+        """Return OCR text for the given page numbers, keyed by page number"""
+        results: Dict[int, str] = {}
+        missing: List[int] = []
+        for page_number, key in fingerprints.items():
+            cached = self.cache.get(key)
+            if cached is None:
+                missing.append(page_number)
+            else:
+                results[page_number] = cached
+        
+        if missing:
+            pool = _get_ocr_pool(self.config.max_workers)
+            futures = {
+                page_number: pool.submit(_ocr_page, file_path, page_number, self.config.language, self.config.dpi)
+                for page_number in missing
+            }
+            for page_number, future in futures.items():
+                try:
+                    text = future.result()
+                except BrokenProcessPool as e:
+                    # Recreate the pool on the next call instead of failing forever
+                    _get_ocr_pool.cache_clear()
+                    print(f"OCR worker pool crashed on {file_path}: {e}")
+                    continue
+                except Exception as e:
+                    # Tesseract missing or page unreadable: keep the native text path
+                    print(f"OCR failed for page {page_number + 1} of {file_path}: {e}")
+                    continue
+                self.cache.put(fingerprints[page_number], text)
+                results[page_number] = text
+        return results
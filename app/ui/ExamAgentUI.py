@@ -1,6 +1,8 @@
 from utils.file_handler import cleanup_temp_file, save_uploaded_file_temporarily
 import streamlit as st
 from ui.UISessionManager import UISessionManager
+from services.work_scheduler import TOKENS_PER_PAGE, WorkType, get_work_scheduler
+from tools.pdf_chunk_loader import count_pdf_pages
 
 class ExamAgentUI:
     """Handles Exam Agent UI interactions"""
@@ -57,10 +59,16 @@ class ExamAgentUI:
                 
                 # Use the OOP service
                 service = create_exam_agent_service()
-                result = service.analyze_exam_preparation(
+                chat_id = self.session_manager.get_chat_id()
+                pages = sum(count_pdf_pages(path) for path in [exam_path, *study_paths] if path.endswith(".pdf"))
+                result = get_work_scheduler().run(
+                    chat_id,
+                    WorkType.BULK,
+                    service.analyze_exam_preparation,
                     exam_file_path=exam_path,
                     study_material_paths=study_paths,
-                    chat_id=self.session_manager.get_chat_id()
+                    chat_id=chat_id,
+                    tokens=pages * TOKENS_PER_PAGE
                 )
                 
                 # Display results
@@ -77,7 +85,10 @@ class ExamAgentUI:
     def _display_exam_results(self, result):
         """Display exam analysis results"""
         st.markdown("### Extracted Topics")
-        st.write(", ".join(result.extracted_topics))
+        if result.topic_weights:
+            st.write(", ".join(f"{topic} ({weight:.0%})" for topic, weight in result.topic_weights.items()))
+        else:
+            st.write(", ".join(result.extracted_topics))
         
         st.markdown("### Study Coverage Analysis")
         for topic, recommendation in result.study_recommendations.items():
@@ -1,7 +1,10 @@
-from utils.file_handler import cleanup_temp_file, save_uploaded_file_temporarily
+from utils.file_handler import cleanup_temp_file, save_uploaded_file
 import streamlit as st
 from typing import Optional
-from ui.UISessionManager import UISessionManager
+from ui.UISessionManager import UISessionManager, ingestion_result_from
+from services.session_store import StoredDocument, get_session_store
+from services.work_scheduler import TOKENS_PER_PAGE, WorkType, get_work_scheduler
+from tools.pdf_chunk_loader import count_pdf_pages
 
 class ResearchAgentUI:
     """Handles Research Agent UI interactions"""
@@ -28,11 +31,20 @@ class ResearchAgentUI:
         
         if st.button("🔍 Analyze Paper"):
             try:
-                # Save file temporarily
-                temp_pdf_path = save_uploaded_file_temporarily(
+                # Stream file to disk temporarily
+                upload = save_uploaded_file(
                     uploaded_file=uploaded_paper, 
                     chat_id=self.session_manager.get_chat_id()
                 )
+                temp_pdf_path = upload.path
+                chat_id = self.session_manager.get_chat_id()
+                store = get_session_store()
+                
+                # Already ingested in this session: its vectors are still attached
+                stored = store.get_document(chat_id, upload.sha256)
+                if stored is not None:
+                    cleanup_temp_file(temp_pdf_path)
+                    return ingestion_result_from(stored)
                 
                 # Import and run ingestion pipeline
                 from pipelines.ingestion_pipeline import create_ingestion_pipeline
@@ -41,11 +53,30 @@ class ResearchAgentUI:
                 
                 # Use the OOP approach
                 pipeline = create_ingestion_pipeline()
-                result = pipeline.process_document(
+                result = get_work_scheduler().run(
+                    chat_id,
+                    WorkType.BULK,
+                    pipeline.process_document,
                     file_path=temp_pdf_path,
-                    chat_id=self.session_manager.get_chat_id()
+                    chat_id=chat_id,
+                    document_id=upload.sha256,
+                    tokens=count_pdf_pages(temp_pdf_path) * TOKENS_PER_PAGE
                 )
                 
+                # Prefetched chunks predate this document; optionally pre-generate answers in the background
+                from agents.research_agent import create_research_agent_service
+                research_service = create_research_agent_service()
+                research_service.invalidate_retrieval(chat_id)
+                research_service.schedule_answer_pack(chat_id, result.document_id)
+                
+                store.save_document(chat_id, StoredDocument(
+                    document_id=result.document_id,
+                    source=uploaded_paper.name,
+                    summary=result.summary,
+                    topics=result.topics,
+                    chunk_count=result.chunk_count
+                ))
+                
                 # Cleanup
                 cleanup_temp_file(temp_pdf_path)
 
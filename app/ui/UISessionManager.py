@@ -1,20 +1,60 @@
 
 from utils.uuid_gen import generate_uuid
 import streamlit as st
+from typing import Optional
+from pipelines.ingestion_pipeline import IngestionResult
+from services.session_store import SQLiteSessionStore, StoredDocument, get_session_store
+
+
+def ingestion_result_from(document: StoredDocument) -> IngestionResult:
+    """Rebuild an ingestion result from its persisted form"""
+    return IngestionResult(
+        summary=document.summary,
+        topics=document.topics,
+        chunk_count=document.chunk_count,
+        document_id=document.document_id
+    )
 
 
 class UISessionManager:
     """Manages UI session state and initialization"""
     
-    def __init__(self):
+    def __init__(self, store: Optional[SQLiteSessionStore] = None):
+        self.store = store or get_session_store()
         self.chat_id = self._initialize_chat_id()
     
     def _initialize_chat_id(self) -> str:
-        """Initialize chat ID only once per session"""
+        """Initialize chat ID only once per session, restoring it from the URL after a refresh"""
         if "chat_id" not in st.session_state:
-            st.session_state.chat_id = generate_uuid()
+            requested = st.query_params.get("chat_id")
+            if not (requested and self.restore(requested)):
+                st.session_state.chat_id = generate_uuid()
+                st.query_params["chat_id"] = st.session_state.chat_id
         return st.session_state.chat_id
     
+    def restore(self, chat_id: str) -> bool:
+        """
+        Reattach a persisted session: chat history and ingestion results are
+        loaded from the store, and its vectors are reused as-is under the same ID.
+        """
+        session = self.store.load(chat_id)
+        if session is None:
+            return False
+        
+        st.session_state.chat_id = chat_id
+        st.session_state.chat_history = list(session.messages)
+        if session.latest_document:
+            st.session_state["analysis_result"] = ingestion_result_from(session.latest_document)
+        else:
+            st.session_state.pop("analysis_result", None)
+        st.query_params["chat_id"] = chat_id
+        
+        from agents.research_agent import create_research_agent_service
+        create_research_agent_service().restore_history(chat_id, session.messages)
+        
+        self.chat_id = chat_id
+        return True
+    
     def get_chat_id(self) -> str:
         """Get current chat ID"""
         return self.chat_id
\ No newline at end of file
@@ -4,6 +4,8 @@ from ui.ResearchAgentUI import ResearchAgentUI
 from ui.ExamAgentUI import ExamAgentUI
 from ui.UISessionManager import UISessionManager
 from ui.chat_panel import render_chat_panel
+from utils.file_handler import start_upload_janitor
+from services.work_scheduler import get_work_scheduler
 
 class EduAgentApp:
     """Main application class that orchestrates the entire UI"""
@@ -12,6 +14,7 @@ class EduAgentApp:
         self.session_manager = UISessionManager()
         self.research_ui = ResearchAgentUI(self.session_manager)
         self.exam_ui = ExamAgentUI(self.session_manager)
+        start_upload_janitor()
     
     def setup_page_config(self):
         """Setup Streamlit page configuration"""
@@ -28,6 +31,28 @@ class EduAgentApp:
         
         st.markdown(f"💬 **Session Chat ID:** `{self.session_manager.get_chat_id()}`")
     
+    def render_queue_status(self):
+        """Show scheduler queue depth and recent wait times in the sidebar"""
+        scheduler = get_work_scheduler()
+        stats = scheduler.wait_stats()
+        st.sidebar.markdown("### ⏱️ Queue")
+        for work_type, values in stats.items():
+            st.sidebar.caption(
+                f"{work_type.title()}: {values['queued']} queued · "
+                f"wait p50 {values['p50']:.1f}s / p95 {values['p95']:.1f}s"
+            )
+        st.sidebar.caption(f"Your token usage this hour: {scheduler.session_usage(self.session_manager.get_chat_id())}")
+    
+    def render_session_restore(self):
+        """Let the user reattach a previous session by its chat ID"""
+        st.sidebar.markdown("### 🔁 Restore Session")
+        requested = st.sidebar.text_input("Session Chat ID", key="restore_chat_id")
+        if st.sidebar.button("Restore"):
+            if requested.strip() and self.session_manager.restore(requested.strip()):
+                st.rerun()
+            else:
+                st.sidebar.error("No saved session with that ID.")
+    
     def render_footer(self):
         """Render the application footer"""
         st.markdown("---")
@@ -40,6 +65,8 @@ class EduAgentApp:
         """Main application entry point"""
         self.setup_page_config()
         self.render_header()
+        self.render_queue_status()
+        self.render_session_restore()
         
         # Create tabs for different agents
         tab1, tab2 = st.tabs(["📄 Research Assistant", "📝 Exam Assistant"])
@@ -1,5 +1,8 @@
 import streamlit as st
 from agents.research_agent import create_research_agent_service
+from services.conversation_memory import estimate_tokens
+from services.work_scheduler import QUESTION_TOKEN_ESTIMATE, WorkType, get_work_scheduler
+from services.session_store import get_session_store
 
 def render_chat_panel(chat_id: str, result=None):
     """Display the chat interface with memory support"""
@@ -44,20 +47,36 @@ def render_chat_panel(chat_id: str, result=None):
             )
 
 
-    # Input field
-    question = st.text_input("Ask a question about the paper:", key="chat_input")
+    # Input field; in prefetch mode retrieval is warmed as soon as the input is committed
+    service = create_research_agent_service()
+    question = st.text_input(
+        "Ask a question about the paper:", 
+        key="chat_input",
+        on_change=_prefetch_question if service.prefetch_enabled else None,
+        args=(chat_id,)
+    )
 
     # Ask button
     if st.button("Ask"):
         if question.strip():
             with st.spinner("ResearchAgent is thinking..."):
                 try:
-                    agent = create_research_agent_service()
-                    answer = agent.ask_question(question=question, chat_id=chat_id)
+                    # Interactive work is scheduled ahead of other sessions' bulk ingestion
+                    answer = get_work_scheduler().run(
+                        chat_id, 
+                        WorkType.INTERACTIVE, 
+                        service.ask_question,
+                        question=question, 
+                        chat_id=chat_id,
+                        tokens=estimate_tokens(question) + QUESTION_TOKEN_ESTIMATE
+                    )
 
-                    # Update session chat history
+                    # Update session chat history and persist it for restore
                     st.session_state.chat_history.append({"role": "user", "message": question})
                     st.session_state.chat_history.append({"role": "agent", "message": answer})
+                    store = get_session_store()
+                    store.append_message(chat_id, "user", question)
+                    store.append_message(chat_id, "agent", answer)
                     st.rerun()
                 except Exception as e:
                     st.error(f"❌ Agent error: {e}")
@@ -67,9 +86,18 @@ def render_chat_panel(chat_id: str, result=None):
     # Reset chat
     if st.button("🗑️ Clear Chat"):
         st.session_state.chat_history = []
+        service.clear_history(chat_id)
+        get_session_store().clear_messages(chat_id)
         st.rerun()
 
 
+def _prefetch_question(chat_id: str):
+    """Start speculative retrieval for the question currently in the input"""
+    question = st.session_state.get("chat_input", "")
+    if question.strip():
+        create_research_agent_service().prefetch(question=question, chat_id=chat_id)
+
+
 def _prepare_first_message(result) -> str:
     """Prepare the summary + topics as the first agent message."""
     summary = f"📄 **Paper Summary:**\n{result.summary}"
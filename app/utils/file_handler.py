@@ -1,11 +1,80 @@
+import hashlib
+import shutil
 import tempfile
+import threading
+import time
 import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+
+@dataclass(frozen=True)
+class UploadConfig:
+    """Configuration for storing uploads and reclaiming abandoned session folders"""
+    data_dir: str = "app/data"
+    max_upload_bytes: int = int(os.environ.get("EDUAGENT_MAX_UPLOAD_MB", "200")) * 1024 * 1024
+    copy_chunk_size: int = 1024 * 1024
+    janitor_interval_seconds: int = 15 * 60
+    max_idle_seconds: int = int(os.environ.get("EDUAGENT_UPLOAD_TTL_HOURS", "6")) * 3600
+
+@dataclass
+class SavedUpload:
+    """An upload persisted to disk"""
+    path: str
+    sha256: str
+    size: int
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit"""
+
+def save_uploaded_file(uploaded_file, chat_id, config: Optional[UploadConfig] = None) -> SavedUpload:
+    """
+    Stream an uploaded file to ``<data_dir>/<chat_id>`` in fixed-size chunks,
+    hashing on the fly and enforcing the size limit without buffering the whole file.
+    """
+    config = config or UploadConfig()
+    declared_size = getattr(uploaded_file, "size", None)
+    if declared_size is not None and declared_size > config.max_upload_bytes:
+        raise UploadTooLargeError(
+            f"File is {declared_size / 1024 / 1024:.1f} MB; limit is {config.max_upload_bytes / 1024 / 1024:.0f} MB"
+        )
+    
+    target_dir = os.path.join(config.data_dir, chat_id)
+    os.makedirs(target_dir, exist_ok=True)
+    suffix = os.path.splitext(getattr(uploaded_file, "name", "") or "")[1] or ".pdf"
+    
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=target_dir, delete=False, suffix=suffix) as tmp:
+        try:
+            for block in iter(lambda: uploaded_file.read(config.copy_chunk_size), b""):
+                size += len(block)
+                if size > config.max_upload_bytes:
+                    raise UploadTooLargeError(
+                        f"File exceeds the {config.max_upload_bytes / 1024 / 1024:.0f} MB upload limit"
+                    )
+                digest.update(block)
+                tmp.write(block)
+        except Exception:
+            tmp.close()
+            cleanup_temp_file(tmp.name)
+            raise
+    
+    return SavedUpload(path=tmp.name, sha256=digest.hexdigest(), size=size)
 
 def save_uploaded_file_temporarily(uploaded_file, chat_id) -> str:
-    os.makedirs(f"app/data/{chat_id}", exist_ok=True)
-    with tempfile.NamedTemporaryFile(dir=f"app/data/{chat_id}", delete=False, suffix=".pdf") as tmp:
-        tmp.write(uploaded_file.read())
-        return tmp.name
+    return save_uploaded_file(uploaded_file, chat_id).path
+
+def compute_file_hash(path: str, block_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in fixed-size blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 def cleanup_temp_file(path: str):
     """
@@ -28,3 +97,48 @@ def cleanup_temp_file(path: str):
     except Exception as e:
         print(f"❌ Failed to clean up: {e}")
 
+
+def _last_activity(path: str) -> float:
+    """Most recent modification time of a directory or anything inside it"""
+    latest = os.path.getmtime(path)
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+            except OSError:
+                pass
+    return latest
+
+def cleanup_abandoned_uploads(config: Optional[UploadConfig] = None) -> List[str]:
+    """Remove ``<data_dir>/<chat_id>`` folders idle for longer than ``max_idle_seconds``"""
+    config = config or UploadConfig()
+    if not os.path.isdir(config.data_dir):
+        return []
+    
+    cutoff = time.time() - config.max_idle_seconds
+    removed = []
+    for entry in os.scandir(config.data_dir):
+        if not entry.is_dir():
+            continue
+        try:
+            if _last_activity(entry.path) < cutoff:
+                shutil.rmtree(entry.path)
+                removed.append(entry.path)
+                print(f"🧹 Reclaimed abandoned upload directory: {entry.path}")
+        except OSError as e:
+            print(f"❌ Failed to reclaim {entry.path}: {e}")
+    return removed
+
+@lru_cache(maxsize=1)
+def start_upload_janitor(config: Optional[UploadConfig] = None) -> threading.Thread:
+    """Start (once per process) a daemon thread that periodically reclaims abandoned uploads"""
+    config = config or UploadConfig()
+    
+    def _run():
+        while True:
+            cleanup_abandoned_uploads(config)
+            time.sleep(config.janitor_interval_seconds)
+    
+    thread = threading.Thread(target=_run, name="upload-janitor", daemon=True)
+    thread.start()
+    return thread